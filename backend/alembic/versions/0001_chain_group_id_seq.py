@@ -0,0 +1,48 @@
+"""
+Create chain_group_id_seq for databases created before it existed
+
+create_all only creates a column-bound Sequence together with its table,
+so on an existing Postgres database the sequence behind
+Group.chain_group_id is missing and every group INSERT fails. This
+creates it and starts it after the highest chain_group_id in use.
+
+On a fresh database (no groups table yet) it only creates the sequence,
+which create_all then reuses; on SQLite it is a no-op.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+"""
+
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    
+    op.execute("""
+        DO $$
+        BEGIN
+            CREATE SEQUENCE IF NOT EXISTS chain_group_id_seq;
+            IF to_regclass('groups') IS NOT NULL THEN
+                PERFORM setval(
+                    'chain_group_id_seq',
+                    COALESCE((SELECT max(chain_group_id) FROM groups), 0) + 1,
+                    false
+                );
+            END IF;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    
+    op.execute("DROP SEQUENCE IF EXISTS chain_group_id_seq")
@@ -3,17 +3,150 @@ API dependencies
 Reusable dependency functions for FastAPI endpoints
 """
 
+import asyncio
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, Optional
+
+from cachetools import TTLCache
 from fastapi import Header, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.db.session import get_db
+from app.services.auth import JWT_VERIFY_KEY
 
 security = HTTPBearer()
 
+# Shared 401 details for the token reject path
+_INVALID_TOKEN_DETAIL = "Invalid token"
+_EXPIRED_DETAIL = "Invalid or expired token"
+_BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
 
-async def get_current_user_address(
+
+def _invalid_token_exc() -> HTTPException:
+    # A fresh instance per raise: a shared one would accumulate traceback
+    # frames (and their locals) and share __cause__ between requests
+    return HTTPException(status_code=401, detail=_INVALID_TOKEN_DETAIL)
+
+
+def _expired_exc() -> HTTPException:
+    return HTTPException(
+        status_code=401,
+        detail=_EXPIRED_DETAIL,
+        headers=_BEARER_CHALLENGE,
+    )
+
+# Accepted private key shapes: base64-encoded key or 25-word mnemonic
+_PK_RE = re.compile(r"^[A-Za-z0-9+/=]{58,}$|^(?:\w+\s){24}\w+$")
+
+# Verified access tokens, keyed on a 16-byte BLAKE2b digest of the token.
+# TTL stays well below the access token lifetime so a cached entry
+# never outlives the token it was decoded from.
+_JWT_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
+
+def _token_digest(token: str) -> bytes:
+    """Compact cache key for a token; raw bearer tokens are never retained"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+# HMAC verification is microsecond-scale and runs inline on the event loop.
+# Asymmetric verification (RS*/ES*/EdDSA) is offloaded to a dedicated pool.
+_IS_SYMMETRIC = settings.JWT_ALGORITHM.startswith("HS")
+_DECODE_POOL = None if _IS_SYMMETRIC else ThreadPoolExecutor(
+    max_workers=os.cpu_count(),
+    thread_name_prefix="jwt-decode"
+)
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    return jwt.decode(
+        token,
+        JWT_VERIFY_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+        options={"require": ["exp", "sub", "type"]}
+    )
+
+
+async def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its claims without blocking the event loop.
+    
+    Raises:
+        InvalidTokenError: If the token is malformed, expired or forged
+    """
+    if _IS_SYMMETRIC:
+        return _decode(token)
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DECODE_POOL, _decode, token)
+
+
+@dataclass(slots=True, frozen=True)
+class AuthCtx:
+    """Authenticated caller resolved from a verified access token"""
+    address: str
+    claims: Dict[str, Any]
+
+
+async def get_current_user_context(
     credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> AuthCtx:
+    """
+    Verify the bearer JWT and return the caller's auth context.
+    
+    FastAPI caches this per request, so endpoints that pull in both this
+    and get_current_user_address still decode the token only once.
+    
+    Returns:
+        AuthCtx with the wallet address and verified claims
+        
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    token = credentials.credentials
+    
+    cache_key = _token_digest(token)
+    cached = _JWT_CACHE.get(cache_key)
+    if cached is not None and cached.claims["exp"] > time.time():
+        return cached
+    
+    try:
+        # Reject wrong-type or already expired tokens from the unverified
+        # claims before paying for signature verification
+        unverified = jwt.decode(token, options={"verify_signature": False})
+        exp = unverified.get("exp")
+        if (
+            unverified.get("type") != "access"
+            or not isinstance(exp, (int, float))
+            or exp < time.time()
+        ):
+            raise InvalidTokenError("Expired or non-access token")
+        
+        payload = await decode_token(token)
+        wallet_address: str = payload.get("sub")
+        token_type: str = payload.get("type")
+        
+        if wallet_address is None or token_type != "access":
+            raise _invalid_token_exc()
+        
+        ctx = AuthCtx(address=wallet_address, claims=payload)
+        _JWT_CACHE[cache_key] = ctx
+        return ctx
+        
+    except InvalidTokenError:
+        raise _expired_exc() from None
+
+
+async def get_current_user_address(
+    ctx: AuthCtx = Depends(get_current_user_context)
 ) -> str:
     """
     Extract wallet address from JWT token.
@@ -29,29 +162,7 @@ async def get_current_user_address(
     Raises:
         HTTPException: If token is invalid or expired
     """
-    try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        wallet_address: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if wallet_address is None or token_type != "access":
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token"
-            )
-            
-        return wallet_address
-        
-    except JWTError:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    return ctx.address
 
 
 async def get_private_key_from_header(
@@ -74,7 +185,7 @@ async def get_private_key_from_header(
         return None
     
     # Basic validation (25-word mnemonic or base64 key)
-    if len(x_private_key) < 20:
+    if not _PK_RE.match(x_private_key):
         return None
     
     return x_private_key
@@ -89,3 +200,10 @@ async def get_optional_private_key(
     Returns None if header is not provided.
     """
     return x_private_key
+
+
+# Annotated dependency aliases for endpoint signatures:
+#     async def endpoint(db: DbDep, user_address: UserDep): ...
+DbDep = Annotated[AsyncSession, Depends(get_db)]
+UserDep = Annotated[str, Depends(get_current_user_address)]
+PKDep = Annotated[Optional[str], Depends(get_private_key_from_header)]
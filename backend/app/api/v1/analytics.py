@@ -3,24 +3,31 @@ Analytics API endpoints
 Statistics and reports
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 router = APIRouter()
 
+# Analytics are heavyweight aggregates that tolerate a minute of staleness.
+# They are per-user/per-group data, so only the client may cache them.
+_CACHE_CONTROL = "private, max-age=60"
+
 
 @router.get("/user")
-async def get_user_analytics():
+async def get_user_analytics(response: Response):
     """Get user spending analytics (to be implemented)"""
+    response.headers["Cache-Control"] = _CACHE_CONTROL
     return {"message": "User analytics - to be implemented"}
 
 
 @router.get("/group/{group_id}")
-async def get_group_analytics(group_id: int):
+async def get_group_analytics(group_id: int, response: Response):
     """Get group spending analytics (to be implemented)"""
+    response.headers["Cache-Control"] = _CACHE_CONTROL
     return {"message": f"Group {group_id} analytics - to be implemented"}
 
 
 @router.get("/trends")
-async def get_spending_trends():
+async def get_spending_trends(response: Response):
     """Get spending trends (to be implemented)"""
+    response.headers["Cache-Control"] = _CACHE_CONTROL
     return {"message": "Spending trends - to be implemented"}
@@ -4,30 +4,38 @@ Wallet-based authentication with signature verification
 """
 
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
-from jose import JWTError, jwt
-from algosdk import encoding, mnemonic
-from algosdk.error import WrongChecksumError
+from jwt import InvalidTokenError
 
 from app.config import settings
-from app.services.auth import AuthService
-from app.models.schemas import User, UserCreate
+from app.services.auth import AuthService, get_auth_service
+from app.api.dependencies import AuthCtx, decode_token, get_current_user_context
+from app.models.schemas import AlgorandAddress, User, UserCreate
 
 
 router = APIRouter()
-security = HTTPBearer()
-auth_service = AuthService()
+
+_UTC = timezone.utc
+
+# Shared 401 details for the auth reject paths
+_INVALID_SIGNATURE_DETAIL = "Invalid signature or expired challenge"
+_INVALID_TOKEN_DETAIL = "Invalid refresh token"
+_EXPIRED_DETAIL = "Invalid or expired refresh token"
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    """Fresh 401 per raise, so no traceback or cause is shared between requests"""
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
 
 
 # Request/Response Models
 
 class ChallengeRequest(BaseModel):
-    wallet_address: str = Field(..., description="Algorand wallet address")
+    wallet_address: AlgorandAddress = Field(..., description="Algorand wallet address")
 
 
 class ChallengeResponse(BaseModel):
@@ -37,7 +45,7 @@ class ChallengeResponse(BaseModel):
 
 
 class VerifyRequest(BaseModel):
-    wallet_address: str = Field(..., description="Algorand wallet address")
+    wallet_address: AlgorandAddress = Field(..., description="Algorand wallet address")
     signature: str = Field(..., description="Base64 encoded signature")
     nonce: str = Field(..., description="Nonce from challenge")
 
@@ -56,21 +64,15 @@ class RefreshRequest(BaseModel):
 # Endpoints
 
 @router.post("/challenge", response_model=ChallengeResponse)
-async def get_challenge(request: ChallengeRequest):
+async def get_challenge(
+    request: ChallengeRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """
     Get authentication challenge for wallet
     
     Returns a nonce that must be signed by the wallet's private key
     """
-    try:
-        # Validate Algorand address format
-        encoding.decode_address(request.wallet_address)
-    except (ValueError, WrongChecksumError):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid Algorand address"
-        )
-    
     # Generate challenge
     nonce, message, expires_at = await auth_service.generate_challenge(
         request.wallet_address
@@ -84,22 +86,16 @@ async def get_challenge(request: ChallengeRequest):
 
 
 @router.post("/verify", response_model=TokenResponse)
-async def verify_signature(request: VerifyRequest):
+async def verify_signature(
+    request: VerifyRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """
     Verify wallet signature and return JWT tokens
     
     The signature must be created by signing the challenge message
     with the wallet's private key
     """
-    try:
-        # Validate address
-        encoding.decode_address(request.wallet_address)
-    except (ValueError, WrongChecksumError):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid Algorand address"
-        )
-    
     # Verify signature
     is_valid = await auth_service.verify_signature(
         wallet_address=request.wallet_address,
@@ -108,10 +104,7 @@ async def verify_signature(request: VerifyRequest):
     )
     
     if not is_valid:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid signature or expired challenge"
-        )
+        raise _unauthorized(_INVALID_SIGNATURE_DETAIL)
     
     # Generate tokens
     access_token = auth_service.create_access_token(request.wallet_address)
@@ -125,20 +118,14 @@ async def verify_signature(request: VerifyRequest):
 
 
 @router.post("/demo", response_model=TokenResponse)
-async def demo_auth(request: ChallengeRequest):
+async def demo_auth(
+    request: ChallengeRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """
     Demo authentication endpoint - issues tokens without verification
     FOR DEVELOPMENT/DEMO ONLY - DO NOT USE IN PRODUCTION
     """
-    try:
-        # Validate Algorand address format
-        encoding.decode_address(request.wallet_address)
-    except (ValueError, WrongChecksumError):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid Algorand address"
-        )
-    
     # Generate tokens directly without signature verification
     access_token = auth_service.create_access_token(request.wallet_address)
     refresh_token = auth_service.create_refresh_token(request.wallet_address)
@@ -151,31 +138,24 @@ async def demo_auth(request: ChallengeRequest):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(request: RefreshRequest):
+async def refresh_token(
+    request: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service)
+):
     """
     Refresh access token using refresh token
     """
     try:
         # Decode refresh token
-        payload = jwt.decode(
-            request.refresh_token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = await decode_token(request.refresh_token)
         wallet_address: str = payload.get("sub")
         token_type: str = payload.get("type")
         
         if wallet_address is None or token_type != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token"
-            )
+            raise _unauthorized(_INVALID_TOKEN_DETAIL)
             
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired refresh token"
-        )
+    except InvalidTokenError:
+        raise _unauthorized(_EXPIRED_DETAIL) from None
     
     # Generate new tokens
     access_token = auth_service.create_access_token(wallet_address)
@@ -190,68 +170,15 @@ async def refresh_token(request: RefreshRequest):
 
 @router.get("/me", response_model=User)
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    ctx: AuthCtx = Depends(get_current_user_context)
 ):
     """
     Get current authenticated user info
     """
-    try:
-        # Decode JWT
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        wallet_address: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if wallet_address is None or token_type != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-            
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
-    
+    # No user rows are persisted, so the profile comes from the token alone
+    now = datetime.now(_UTC)
     return User(
-        wallet_address=wallet_address,
-        created_at=datetime.utcnow(),
-        last_login=datetime.utcnow()
+        wallet_address=ctx.address,
+        created_at=now,
+        last_login=now
     )
-
-
-# Dependency for protected routes
-async def get_current_user_address(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> str:
-    """
-    Dependency to extract wallet address from JWT
-    Use in protected endpoints: user: str = Depends(get_current_user_address)
-    """
-    try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        wallet_address: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        
-        if wallet_address is None or token_type != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-            
-        return wallet_address
-        
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
@@ -6,10 +6,8 @@ Track and manage group expenses
 import logging
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from app.models.schemas import (
     ExpenseCreate,
@@ -18,8 +16,9 @@ from app.models.schemas import (
     ExpenseListResponse
 )
 from app.services.expense import ExpenseService
-from app.db.session import get_db
-from app.api.dependencies import get_current_user_address, get_private_key_from_header
+from app.middleware.ratelimit import RateLimit
+from app.api.dependencies import DbDep, UserDep, PKDep
+from app.utils.cache import invalidate_plans
 from app.utils.errors import (
     ValidationError,
     ResourceNotFoundError,
@@ -28,18 +27,20 @@ from app.utils.errors import (
 from app.models.database import GroupMember
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 logger = logging.getLogger(__name__)
 
 
-@router.post("", response_model=Expense)
-@limiter.limit("20/minute")
+@router.post(
+    "",
+    response_model=Expense,
+    dependencies=[Depends(RateLimit("create_expense", 20, 60))]
+)
 async def create_expense(
     request: Request,
     expense_data: ExpenseCreate,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address),
-    private_key: str = Depends(get_private_key_from_header)
+    db: DbDep,
+    user_address: UserDep,
+    private_key: PKDep
 ):
     """
     Create a new expense and record it on-chain.
@@ -63,16 +64,13 @@ async def create_expense(
                     GroupMember.group_id == expense_data.group_id
                 )
             )
-            split_with = [row[0] for row in member_result.fetchall()]
-            if not split_with:
-                split_with = [user_address]
+            split_with = list(member_result.scalars().all())
         else:
             # Custom split - extract addresses from splits
             split_with = [split.wallet_address for split in expense_data.splits]
         
-        # Ensure payer is in split
-        if user_address not in split_with:
-            split_with.append(user_address)
+        # Ensure payer is in split; dedupe in one pass, preserving order
+        split_with = list(dict.fromkeys([*split_with, user_address]))
         
         expense = await expense_service.create_expense(
             group_id=expense_data.group_id,
@@ -84,6 +82,8 @@ async def create_expense(
             split_type=expense_data.split_type
         )
         
+        await invalidate_plans(request.app.state.redis, [expense_data.group_id])
+        
         return expense
         
     except ValidationError as e:
@@ -96,14 +96,14 @@ async def create_expense(
         raise HTTPException(status_code=500, detail="Failed to create expense")
 
 
-@router.get("", response_model=ExpenseListResponse)
+@router.get("", response_model=ExpenseListResponse, response_class=ORJSONResponse)
 async def list_expenses(
+    db: DbDep,
+    user_address: UserDep,
     group_id: int = Query(..., description="Group ID to filter expenses"),
     include_settled: bool = Query(True, description="Include settled expenses"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    page_size: int = Query(20, ge=1, le=100)
 ):
     """
     List expenses with filtering and pagination.
@@ -118,7 +118,7 @@ async def list_expenses(
     
     offset = (page - 1) * page_size
     
-    expenses = await expense_service.get_group_expenses(
+    expenses, total = await expense_service.get_group_expenses(
         group_id=group_id,
         include_settled=include_settled,
         limit=page_size,
@@ -127,7 +127,7 @@ async def list_expenses(
     
     return ExpenseListResponse(
         expenses=expenses,
-        total=len(expenses),  # TODO: Get actual count
+        total=total,
         page=page,
         page_size=page_size
     )
@@ -136,8 +136,8 @@ async def list_expenses(
 @router.get("/{expense_id}", response_model=ExpenseWithSplits)
 async def get_expense(
     expense_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Get expense details including splits.
@@ -156,8 +156,8 @@ async def get_expense(
 @router.get("/group/{group_id}/balance")
 async def get_user_balance_in_group(
     group_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Get user's balance in a group.
@@ -185,9 +185,10 @@ async def get_user_balance_in_group(
 
 @router.post("/{expense_id}/settle")
 async def mark_expense_settled(
+    request: Request,
     expense_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Mark an expense as settled.
@@ -202,6 +203,9 @@ async def mark_expense_settled(
             expense_id=expense_id,
             settled_by_address=user_address
         )
+        
+        await invalidate_plans(request.app.state.redis, [expense.group_id])
+        
         return {"status": "success", "expense": expense}
         
     except ResourceNotFoundError as e:
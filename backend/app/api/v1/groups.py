@@ -3,33 +3,47 @@ Groups API endpoints
 Create and manage expense split groups
 """
 
+import asyncio
+import logging
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.api.v1.auth import get_current_user_address
-from app.db.session import get_db
+from app.api.dependencies import DbDep, UserDep, PKDep
+from app.middleware.ratelimit import RateLimit
 from app.models import database as db_models
 from app.models.schemas import (
     Group, GroupCreate, GroupUpdate, GroupWithMembers,
-    GroupMemberAdd, GroupBalance
+    GroupMemberAdd, GroupMembersAdd, GroupBalance
 )
+from app.services.algorand_service import get_algorand_service
 from app.services.group import GroupService
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.utils.errors import SmartContractError
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
+logger = logging.getLogger(__name__)
 
-@router.post("", response_model=Group, status_code=status.HTTP_201_CREATED)
-@limiter.limit("10/minute")
+
+def _format_algo(microalgos: int) -> str:
+    """Format a signed microAlgo amount as ALGO with exact integer math"""
+    whole, frac = divmod(abs(microalgos), 1_000_000)
+    sign = "-" if microalgos < 0 else ""
+    return f"{sign}{whole}.{frac:06d} ALGO"
+
+
+@router.post(
+    "",
+    response_model=Group,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimit("create_group", 10, 60))]
+)
 async def create_group(
-    request: Request,
     group: GroupCreate,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Create a new expense split group
@@ -59,93 +73,90 @@ async def create_group(
         )
 
 
-@router.get("", response_model=List[GroupWithMembers])
+@router.get("", response_model=List[GroupWithMembers], response_class=ORJSONResponse)
 async def list_groups(
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address),
+    db: DbDep,
+    user_address: UserDep,
     active_only: bool = Query(True, description="Filter to active groups only")
 ):
     """
     List all groups the user is a member of
     """
-    # Query groups where user is a member
-    query = select(db_models.Group).join(
-        db_models.GroupMember
-    ).where(
-        db_models.GroupMember.wallet_address == user_address
+    # Query groups where user is a member, together with every member
+    # of those groups, in a single round trip
+    membership = aliased(db_models.GroupMember)
+    query = select(
+        db_models.Group,
+        db_models.GroupMember.wallet_address
+    ).join(
+        membership,
+        and_(
+            membership.group_id == db_models.Group.id,
+            membership.wallet_address == user_address
+        )
+    ).join(
+        db_models.GroupMember,
+        db_models.GroupMember.group_id == db_models.Group.id
     )
     
     if active_only:
         query = query.where(db_models.Group.active == True)
     
     result = await db.execute(query)
-    groups = result.scalars().all()
     
-    # Add members to each group
-    groups_with_members = []
-    for group in groups:
-        members_query = select(db_models.GroupMember.wallet_address).where(
-            db_models.GroupMember.group_id == group.id
-        )
-        members_result = await db.execute(members_query)
-        members = [m[0] for m in members_result.all()]
-        
-        group_dict = {
-            "id": group.id,
-            "chain_group_id": group.chain_group_id,
-            "name": group.name,
-            "description": group.description,
-            "admin_address": group.admin_address,
-            "created_at": group.created_at,
-            "updated_at": group.updated_at,
-            "active": group.active,
-            "members": members
-        }
-        groups_with_members.append(group_dict)
+    # Bucket member addresses by group
+    groups_with_members = {}
+    for group, member_address in result.all():
+        group_dict = groups_with_members.get(group.id)
+        if group_dict is None:
+            group_dict = {
+                "id": group.id,
+                "chain_group_id": group.chain_group_id,
+                "name": group.name,
+                "description": group.description,
+                "admin_address": group.admin_address,
+                "created_at": group.created_at,
+                "updated_at": group.updated_at,
+                "active": group.active,
+                "members": []
+            }
+            groups_with_members[group.id] = group_dict
+        group_dict["members"].append(member_address)
     
-    return groups_with_members
+    return list(groups_with_members.values())
 
 
 @router.get("/{group_id}", response_model=GroupWithMembers)
 async def get_group(
     group_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Get details of a specific group
     """
-    # Check if user is a member
-    member_query = select(db_models.GroupMember).where(
-        and_(
-            db_models.GroupMember.group_id == group_id,
-            db_models.GroupMember.wallet_address == user_address
-        )
+    # Fetch the group and all of its members in one round trip
+    query = select(
+        db_models.Group,
+        db_models.GroupMember.wallet_address
+    ).outerjoin(
+        db_models.GroupMember,
+        db_models.GroupMember.group_id == db_models.Group.id
+    ).where(
+        db_models.Group.id == group_id
     )
-    member_result = await db.execute(member_query)
-    if not member_result.scalar_one_or_none():
+    rows = (await db.execute(query)).all()
+    members = [member_address for _, member_address in rows if member_address is not None]
+    
+    # Check if user is a member; a missing group answers the same way,
+    # so non-members can't probe which group ids exist
+    if user_address not in members:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a member of this group"
         )
     
-    # Get group
-    group_query = select(db_models.Group).where(db_models.Group.id == group_id)
-    group_result = await db.execute(group_query)
-    group = group_result.scalar_one_or_none()
-    
-    if not group:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group not found"
-        )
-    
-    # Get members
-    members_query = select(db_models.GroupMember.wallet_address).where(
-        db_models.GroupMember.group_id == group_id
-    )
-    members_result = await db.execute(members_query)
-    members = [m[0] for m in members_result.all()]
+    group = rows[0][0]
     
     return {
         "id": group.id,
@@ -164,8 +175,8 @@ async def get_group(
 async def update_group(
     group_id: int,
     group_update: GroupUpdate,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Update group metadata (admin only)
@@ -200,19 +211,23 @@ async def update_group(
     return group
 
 
-@router.post("/{group_id}/members", status_code=status.HTTP_201_CREATED)
-@limiter.limit("20/minute")
+@router.post(
+    "/{group_id}/members",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimit("add_member", 20, 60))]
+)
 async def add_member(
-    request: Request,
     group_id: int,
     member: GroupMemberAdd,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep,
+    private_key: PKDep
 ):
     """
     Add a member to the group (admin only)
     
     Executes both on-chain (smart contract) and off-chain (database) updates.
+    The on-chain call needs the admin's X-Private-Key header.
     """
     group_service = GroupService(db)
     
@@ -220,7 +235,8 @@ async def add_member(
         await group_service.add_member(
             group_id=group_id,
             member_address=member.wallet_address,
-            admin_address=user_address
+            admin_address=user_address,
+            admin_private_key=private_key
         )
         return {"message": "Member added successfully"}
         
@@ -234,14 +250,60 @@ async def add_member(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+    except SmartContractError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post(
+    "/{group_id}/members/batch",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(RateLimit("add_member", 20, 60))]
+)
+async def add_members(
+    group_id: int,
+    members: GroupMembersAdd,
+    db: DbDep,
+    user_address: UserDep,
+    private_key: PKDep
+):
+    """
+    Add several members to the group at once (admin only)
+    
+    On-chain, members are added in atomic groups of up to 16 transactions,
+    so a bulk invite costs one confirmation per group instead of one per
+    member.
+    """
+    group_service = GroupService(db)
+    
+    try:
+        await group_service.add_members_bulk(
+            group_id=group_id,
+            member_addresses=members.wallet_addresses,
+            admin_address=user_address,
+            admin_private_key=private_key
+        )
+        return {"message": "Members added successfully"}
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except SmartContractError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 
 @router.delete("/{group_id}/members/{wallet_address}")
 async def remove_member(
     group_id: int,
     wallet_address: str,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Remove a member from the group (admin only)
@@ -268,54 +330,83 @@ async def remove_member(
         )
 
 
-@router.get("/{group_id}/balances", response_model=List[GroupBalance])
+@router.get(
+    "/{group_id}/balances",
+    response_model=List[GroupBalance],
+    response_class=ORJSONResponse
+)
 async def get_group_balances(
     group_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Get current balances for all members in the group
     
     Returns who owes whom. Positive balance = owed to them, negative = they owe.
+    
+    Balances are read from the group's ExpenseTracker balances box in a
+    single algod call, concurrently with the member lookup; if algod is
+    unavailable the stored balances are returned instead.
     """
-    # Check if user is a member
-    member_query = select(db_models.GroupMember).where(
+    # Check if user is a member, fetching the on-chain group id with it
+    chain_group_query = select(db_models.Group.chain_group_id).join(
+        db_models.GroupMember,
+        db_models.GroupMember.group_id == db_models.Group.id
+    ).where(
         and_(
-            db_models.GroupMember.group_id == group_id,
+            db_models.Group.id == group_id,
             db_models.GroupMember.wallet_address == user_address
         )
     )
-    member_result = await db.execute(member_query)
-    if not member_result.scalar_one_or_none():
+    chain_group_id = (await db.execute(chain_group_query)).scalar_one_or_none()
+    if chain_group_id is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not a member of this group"
         )
     
-    # Get balances from cache
-    balances_query = select(db_models.Balance).where(
+    # Members with a balance entry, alongside the on-chain balances
+    balances_query = select(
+        db_models.Balance.wallet_address,
+        db_models.Balance.balance
+    ).where(
         db_models.Balance.group_id == group_id
     )
-    balances_result = await db.execute(balances_query)
-    balances = balances_result.scalars().all()
+    balances_result, chain_balances = await asyncio.gather(
+        db.execute(balances_query),
+        get_algorand_service().get_group_balances(chain_group_id),
+        return_exceptions=True
+    )
+    if isinstance(balances_result, BaseException):
+        raise balances_result
+    
+    stored_balances = dict(balances_result.all())
+    if isinstance(chain_balances, BaseException):
+        logger.error(f"Failed to read on-chain group balances: {chain_balances}")
+        balances = stored_balances
+    else:
+        balances = {
+            wallet_address: chain_balances.get(wallet_address, 0)
+            for wallet_address in stored_balances
+        }
     
     # Format response
     return [
         {
-            "wallet_address": balance.wallet_address,
-            "balance": balance.balance,
-            "formatted_balance": f"{balance.balance / 1_000_000:.6f} ALGO"
+            "wallet_address": wallet_address,
+            "balance": balance,
+            "formatted_balance": _format_algo(balance)
         }
-        for balance in balances
+        for wallet_address, balance in balances.items()
     ]
 
 
 @router.delete("/{group_id}")
 async def deactivate_group(
     group_id: int,
-    db: AsyncSession = Depends(get_db),
-    user_address: str = Depends(get_current_user_address)
+    db: DbDep,
+    user_address: UserDep
 ):
     """
     Deactivate a group (admin only)
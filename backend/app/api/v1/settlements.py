@@ -5,11 +5,12 @@ Execute and track debt settlements
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from app.models.schemas import (
     SettlementInitiate,
@@ -17,8 +18,18 @@ from app.models.schemas import (
     SettlementPlan
 )
 from app.services.settlement import SettlementService
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db
+from app.models.database import Expense
+from app.middleware.ratelimit import RateLimit
 from app.api.dependencies import get_current_user_address, get_private_key_from_header
+from app.utils.cache import (
+    PLAN_TTL_SECONDS,
+    cache_get_versioned,
+    cache_set_if_version,
+    invalidate_plans,
+    plan_cache_key,
+    plan_version_key
+)
 from app.utils.errors import (
     ValidationError,
     ResourceNotFoundError,
@@ -28,14 +39,33 @@ from app.utils.errors import (
 )
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 logger = logging.getLogger(__name__)
 
+# Built once at import; validates ORM rows and serializes to JSON bytes in pydantic-core
+_SETTLEMENT_LIST = TypeAdapter(List[Settlement])
+
+
+async def _invalidate_settlement_plan(request: Request, db: AsyncSession, expense_id: Optional[int]) -> None:
+    """
+    Drop the cached plan of the group a completed settlement counts toward.
+    
+    Plans only net completed settlements through their expense, so a
+    standalone settlement leaves every cached plan valid.
+    """
+    if expense_id is None:
+        return
+    result = await db.execute(
+        select(Expense.group_id).where(Expense.id == expense_id)
+    )
+    await invalidate_plans(request.app.state.redis, result.scalars().all())
+
 
-@router.post("/initiate", response_model=Settlement)
-@limiter.limit("10/minute")
+@router.post(
+    "/initiate",
+    response_model=Settlement,
+    dependencies=[Depends(RateLimit("initiate", 10, 60))]
+)
 async def initiate_settlement(
-    request: Request,
     settlement_data: SettlementInitiate,
     db: AsyncSession = Depends(get_db),
     user_address: str = Depends(get_current_user_address),
@@ -83,8 +113,11 @@ async def initiate_settlement(
         raise HTTPException(status_code=500, detail="Failed to initiate settlement")
 
 
-@router.post("/execute/{settlement_id}", response_model=Settlement)
-@limiter.limit("5/minute")
+@router.post(
+    "/execute/{settlement_id}",
+    response_model=Settlement,
+    dependencies=[Depends(RateLimit("execute", 5, 60))]
+)
 async def execute_settlement(
     request: Request,
     settlement_id: int,
@@ -113,6 +146,8 @@ async def execute_settlement(
             debtor_private_key=private_key
         )
         
+        await _invalidate_settlement_plan(request, db, settlement.expense_id)
+        
         return settlement
         
     except ResourceNotFoundError as e:
@@ -130,6 +165,7 @@ async def execute_settlement(
 
 @router.get("/calculate/{group_id}", response_model=SettlementPlan)
 async def calculate_optimal_settlements(
+    request: Request,
     group_id: int,
     db: AsyncSession = Depends(get_db),
     user_address: str = Depends(get_current_user_address)
@@ -142,7 +178,20 @@ async def calculate_optimal_settlements(
     
     Returns a list of settlements that will fully settle
     all balances in the group.
+    
+    Plans are cached in Redis per group and invalidated whenever an
+    expense is recorded or settled, or a settlement against one of the
+    group's expenses completes. The plan is only cached if no
+    invalidation landed while it was being computed.
     """
+    redis = request.app.state.redis
+    cache_key = plan_cache_key(group_id)
+    version_key = plan_version_key(group_id)
+    
+    cached, version = await cache_get_versioned(redis, cache_key, version_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     settlement_service = SettlementService(db)
     
     try:
@@ -150,18 +199,19 @@ async def calculate_optimal_settlements(
             group_id=group_id
         )
         
-        total_amount = sum(s["amount"] for s in settlements)
+        # Service output is trusted; build the response without re-validating
+        items, total_amount = [], 0
+        for from_address, to_address, amount in settlements:
+            total_amount += amount
+            items.append(SettlementInitiate.model_construct(
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount
+            ))
         
-        return SettlementPlan(
-            settlements=[
-                SettlementInitiate(
-                    from_address=s["from_address"],
-                    to_address=s["to_address"],
-                    amount=s["amount"]
-                )
-                for s in settlements
-            ],
-            total_transactions=len(settlements),
+        plan = SettlementPlan.model_construct(
+            settlements=items,
+            total_transactions=len(items),
             total_amount=total_amount
         )
         
@@ -170,6 +220,13 @@ async def calculate_optimal_settlements(
     except Exception as e:
         logger.error(f"Failed to calculate settlements: {e}")
         raise HTTPException(status_code=500, detail="Failed to calculate settlements")
+    
+    await cache_set_if_version(
+        redis, cache_key, plan.model_dump_json().encode(), PLAN_TTL_SECONDS,
+        version_key, version
+    )
+    
+    return plan
 
 
 @router.get("", response_model=List[Settlement])
@@ -199,12 +256,41 @@ async def list_settlements(
         limit=limit
     )
     
-    return settlements
+    items = _SETTLEMENT_LIST.validate_python(settlements, from_attributes=True)
+    return Response(content=_SETTLEMENT_LIST.dump_json(items), media_type="application/json")
+
+
+@router.get("/export")
+async def export_settlements(
+    group_id: Optional[int] = Query(None, description="Filter by group"),
+    status: Optional[str] = Query(None, description="Filter by status (pending/completed/failed)"),
+    user_address: str = Depends(get_current_user_address)
+):
+    """
+    Export all settlements for the authenticated user as NDJSON.
+    
+    Unlike the list endpoint this is unbounded; rows are streamed from
+    the database in batches, one JSON object per line.
+    """
+    async def ndjson():
+        # The request-scoped session closes before a streamed body is sent,
+        # so the stream owns its session
+        async with AsyncSessionLocal() as session:
+            settlement_service = SettlementService(session)
+            async for row in settlement_service.stream_user_settlements(
+                wallet_address=user_address,
+                group_id=group_id,
+                status=status
+            ):
+                yield Settlement.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 @router.get("/{settlement_id}")
 async def get_settlement_status(
     settlement_id: int,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     user_address: str = Depends(get_current_user_address)
 ):
@@ -223,6 +309,11 @@ async def get_settlement_status(
         status_info = await settlement_service.get_settlement_status(
             settlement_id=settlement_id
         )
+        
+        # Completed settlements never change; let clients stop polling
+        if status_info["status"] == "completed":
+            response.headers["Cache-Control"] = "private, max-age=60, immutable"
+        
         return status_info
         
     except ResourceNotFoundError as e:
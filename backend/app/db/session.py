@@ -3,15 +3,47 @@ Database session management
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from app.config import settings
 
+
+def _engine_options(url: str) -> dict:
+    """Pool configuration for the configured driver"""
+    if url.startswith("postgresql+asyncpg"):
+        options = {
+            "pool_size": 20,
+            "max_overflow": 10,
+            "pool_timeout": 30,
+            "pool_pre_ping": True,
+            "pool_recycle": 3600,
+        }
+        if settings.DB_BEHIND_PGBOUNCER:
+            # Transaction pooling hands each transaction a different server
+            # connection, so prepared statements can't be reused across them
+            options["connect_args"] = {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+            }
+        return options
+    if url.startswith("sqlite") and ":memory:" in url:
+        # Single shared connection so every session sees the same database
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    if url.startswith("sqlite"):
+        return {"poolclass": AsyncAdaptedQueuePool, "pool_size": 5}
+    return {"pool_pre_ping": True}
+
+
 # Create async engine
+# SQL echo stays off regardless of DEBUG; it logs every statement on the hot path
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    poolclass=NullPool if "sqlite" in settings.DATABASE_URL else None,
+    echo=False,
+    query_cache_size=1200,
+    **_engine_options(settings.DATABASE_URL),
 )
 
 # Create async session factory
@@ -30,13 +62,13 @@ async def get_db() -> AsyncSession:
     Usage in FastAPI endpoints:
         async def endpoint(db: AsyncSession = Depends(get_db)):
             ...
+    
+    The session is not committed here; write paths commit explicitly,
+    so read-only requests never pay for a COMMIT round trip.
     """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
@@ -3,22 +3,27 @@ AlgoCampus Backend API
 FastAPI application entry point
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import ORJSONResponse
+import httpx
+from redis.asyncio import Redis
+from sqlalchemy import text
+from brotli_asgi import BrotliMiddleware
 
+from app.middleware.ratelimit import init_rate_limiter
 from app.api.v1 import auth, groups, expenses, settlements, analytics
 from app.config import settings
-from app.db.session import engine
+from app.db.session import AsyncSessionLocal, engine
 from app.models.database import Base
-
-
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+from app.services.algorand_service import get_algorand_service
+from app.services.settlement import (
+    start_settlement_write_batcher,
+    stop_settlement_write_batcher
+)
 
 
 @asynccontextmanager
@@ -27,11 +32,41 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting AlgoCampus Backend...")
     
-    # Create database tables
+    # Blocking Algorand SDK calls run via asyncio.to_thread on the default executor
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.ALGORAND_SDK_THREADS,
+            thread_name_prefix="algosdk"
+        )
+    )
+    
+    # Create database tables in a single transaction
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        if engine.dialect.name == "postgresql":
+            # Fail fast instead of hanging behind another worker's DDL
+            await conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        await conn.run_sync(Base.metadata.create_all, checkfirst=True)
     
     print("Database initialized")
+    
+    if settings.SETTLEMENT_WRITE_BATCHING:
+        start_settlement_write_batcher(AsyncSessionLocal)
+    
+    # Shared Redis client (rate limiting)
+    app.state.redis = Redis.from_url(settings.REDIS_URL)
+    init_rate_limiter(app, app.state.redis)
+    
+    # Shared keep-alive HTTP/2 client for algod/indexer REST calls
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200)
+    )
+    algorand_service = get_algorand_service()
+    algorand_service.attach_http_client(app.state.http)
+    await algorand_service.warm_up()
+    algorand_service.start_params_refresh()
+    
     print(f"Algorand Network: {settings.ALGORAND_NETWORK}")
     print(f"Indexer URL: {settings.ALGORAND_INDEXER_URL}")
     
@@ -39,6 +74,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("Shutting down AlgoCampus Backend...")
+    await get_algorand_service().stop_params_refresh()
+    await stop_settlement_write_batcher()
+    await app.state.redis.aclose()
+    await app.state.http.aclose()
+    await engine.dispose()
 
 
 # Create FastAPI app
@@ -47,14 +87,11 @@ app = FastAPI(
     description="Campus Finance DApp Backend - Split expenses, settle debts on Algorand",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
 
-# Add rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -64,8 +101,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Gzip middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compression: Brotli at a low quality level, gzip for clients without br support
+app.add_middleware(BrotliMiddleware, quality=4, minimum_size=500, gzip_fallback=True)
 
 
 # Health check
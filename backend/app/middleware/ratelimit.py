@@ -0,0 +1,84 @@
+"""
+Rate limiting
+Sliding-window limiter on Redis sorted sets, shared across all workers
+"""
+
+import logging
+import secrets
+import time
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.api.dependencies import get_current_user_address
+
+logger = logging.getLogger(__name__)
+
+# Drop hits older than the window, then record this hit only if the
+# window still has room. Returns the number of hits before this one.
+# KEYS[1] = bucket, ARGV = now_ms, window_ms, limit, member
+_SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+end
+return count
+"""
+
+
+def init_rate_limiter(app: FastAPI, redis: Redis) -> None:
+    """
+    Register the limiter script on the app's Redis client.
+    
+    Call once at startup; the script object runs via EVALSHA and
+    reloads itself if Redis has flushed its script cache.
+    """
+    app.state.rate_limit_script = redis.register_script(_SLIDING_WINDOW_SCRIPT)
+
+
+class RateLimit:
+    """
+    Dependency allowing `times` requests per `seconds` per user for a named route.
+    
+    Usage:
+    ```python
+    @router.post("/initiate", dependencies=[Depends(RateLimit("initiate", 10, 60))])
+    ```
+    """
+    
+    def __init__(self, name: str, times: int, seconds: int):
+        self.name = name
+        self.times = times
+        self.seconds = seconds
+        self.window_ms = seconds * 1000
+    
+    async def __call__(
+        self,
+        request: Request,
+        user_address: str = Depends(get_current_user_address)
+    ) -> None:
+        key = f"rl:{self.name}:{user_address}"
+        now_ms = int(time.time() * 1000)
+        member = f"{now_ms}-{secrets.token_hex(4)}"
+        
+        try:
+            count = await request.app.state.rate_limit_script(
+                keys=[key],
+                args=[now_ms, self.window_ms, self.times, member]
+            )
+        except RedisError as e:
+            # Fail open: an unavailable Redis must not take the API down
+            logger.warning(f"Rate limit check skipped, Redis unavailable: {e}")
+            return
+        
+        if count >= self.times:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(self.seconds)}
+            )
@@ -3,61 +3,69 @@ SQLAlchemy database models
 """
 
 from datetime import datetime
+from typing import Any, List, Optional
+
 from sqlalchemy import (
-    Column, Integer, String, BigInteger, Boolean, 
-    DateTime, Text, ForeignKey, Index, JSON
+    Integer, String, BigInteger, Boolean,
+    DateTime, Text, ForeignKey, Index, JSON, Sequence
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
 
 
 class User(Base):
     """User table - tracks wallet addresses"""
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True)
-    wallet_address = Column(String(58), unique=True, nullable=False, index=True)
-    nonce = Column(String(64), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_login = Column(DateTime)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    wallet_address: Mapped[str] = mapped_column(String(58), unique=True, nullable=False, index=True)
+    nonce: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
     # Relationships
-    groups = relationship("GroupMember", back_populates="user")
+    groups: Mapped[List["GroupMember"]] = relationship(back_populates="user")
 
 
 class Group(Base):
     """Group table - mirrors on-chain group data"""
     __tablename__ = "groups"
     
-    id = Column(Integer, primary_key=True)
-    chain_group_id = Column(BigInteger, unique=True, nullable=False, index=True)
-    name = Column(String(255), nullable=False)
-    description = Column(Text)
-    admin_address = Column(String(58), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    active = Column(Boolean, default=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Drawn from a sequence on Postgres so concurrent creates never collide
+    chain_group_id: Mapped[int] = mapped_column(
+        BigInteger, Sequence("chain_group_id_seq"), unique=True, nullable=False, index=True
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    admin_address: Mapped[str] = mapped_column(String(58), nullable=False, index=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
     
     # Relationships
-    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
-    expenses = relationship("Expense", back_populates="group", cascade="all, delete-orphan")
-    balances = relationship("Balance", back_populates="group", cascade="all, delete-orphan")
+    members: Mapped[List["GroupMember"]] = relationship(back_populates="group", cascade="all, delete-orphan")
+    expenses: Mapped[List["Expense"]] = relationship(back_populates="group", cascade="all, delete-orphan")
+    balances: Mapped[List["Balance"]] = relationship(back_populates="group", cascade="all, delete-orphan")
 
 
 class GroupMember(Base):
     """Group membership table"""
     __tablename__ = "group_members"
     
-    id = Column(Integer, primary_key=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
-    wallet_address = Column(String(58), ForeignKey("users.wallet_address"), nullable=False, index=True)
-    joined_at = Column(DateTime, default=datetime.utcnow)
-    role = Column(String(20), default="member")  # admin, member
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    group_id: Mapped[int] = mapped_column(Integer, ForeignKey("groups.id"), nullable=False)
+    wallet_address: Mapped[str] = mapped_column(String(58), ForeignKey("users.wallet_address"), nullable=False, index=True)
+    joined_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    role: Mapped[Optional[str]] = mapped_column(String(20), default="member")  # admin, member
     
     # Relationships
-    group = relationship("Group", back_populates="members")
-    user = relationship("User", back_populates="groups", foreign_keys=[wallet_address])
+    group: Mapped["Group"] = relationship(back_populates="members")
+    user: Mapped["User"] = relationship(back_populates="groups", foreign_keys=[wallet_address])
     
     # Constraints
     __table_args__ = (
@@ -69,84 +77,123 @@ class Expense(Base):
     """Expense table - tracks group expenses"""
     __tablename__ = "expenses"
     
-    id = Column(Integer, primary_key=True)
-    chain_expense_id = Column(BigInteger, unique=True, index=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False, index=True)
-    amount = Column(BigInteger, nullable=False)  # microAlgos
-    description = Column(Text)
-    payer_address = Column(String(58), nullable=False, index=True)
-    split_type = Column(String(20), nullable=False)  # equal, custom
-    created_at = Column(DateTime, default=datetime.utcnow)
-    settled = Column(Boolean, default=False, index=True)
-    transaction_id = Column(String(52))  # Algorand txn ID
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chain_expense_id: Mapped[Optional[int]] = mapped_column(BigInteger, unique=True, index=True)
+    group_id: Mapped[int] = mapped_column(Integer, ForeignKey("groups.id"), nullable=False, index=True)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)  # microAlgos
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    payer_address: Mapped[str] = mapped_column(String(58), nullable=False, index=True)
+    split_type: Mapped[str] = mapped_column(String(20), nullable=False)  # equal, custom
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    settled: Mapped[Optional[bool]] = mapped_column(Boolean, default=False, index=True)
+    transaction_id: Mapped[Optional[str]] = mapped_column(String(52))  # Algorand txn ID
     
     # Relationships
-    group = relationship("Group", back_populates="expenses")
-    splits = relationship("ExpenseSplit", back_populates="expense", cascade="all, delete-orphan")
+    group: Mapped["Group"] = relationship(back_populates="expenses")
+    splits: Mapped[List["ExpenseSplit"]] = relationship(back_populates="expense", cascade="all, delete-orphan")
+
+
+# Partial index for a group's unsettled expenses, newest first. Declared after
+# the class because the sort direction and predicate need the mapped columns
+Index(
+    "idx_expense_group_unsettled",
+    Expense.group_id,
+    Expense.created_at.desc(),
+    postgresql_where=Expense.settled.is_(False),
+    sqlite_where=Expense.settled.is_(False)
+)
+
+# Recency ordering for cross-group expense listings
+Index("ix_expense_created_id", Expense.created_at.desc(), Expense.id)
 
 
 class ExpenseSplit(Base):
     """Expense split table - who owes what"""
     __tablename__ = "expense_splits"
     
-    id = Column(Integer, primary_key=True)
-    expense_id = Column(Integer, ForeignKey("expenses.id"), nullable=False, index=True)
-    wallet_address = Column(String(58), nullable=False, index=True)
-    amount = Column(BigInteger, nullable=False)  # microAlgos owed
-    settled = Column(Boolean, default=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    expense_id: Mapped[int] = mapped_column(Integer, ForeignKey("expenses.id"), nullable=False, index=True)
+    wallet_address: Mapped[str] = mapped_column(String(58), nullable=False)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)  # microAlgos owed
+    settled: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     
     # Relationships
-    expense = relationship("Expense", back_populates="splits")
+    expense: Mapped["Expense"] = relationship(back_populates="splits")
+    
+    # Indexes - covers the user's split -> expense join without a heap lookup
+    __table_args__ = (
+        Index("ix_expense_split_wallet_expense", "wallet_address", "expense_id"),
+    )
 
 
 class Settlement(Base):
     """Settlement table - debt settlements"""
     __tablename__ = "settlements"
     
-    id = Column(Integer, primary_key=True)
-    chain_settlement_id = Column(BigInteger, unique=True, index=True)
-    expense_id = Column(Integer, ForeignKey("expenses.id"), index=True)
-    from_address = Column(String(58), nullable=False, index=True)
-    to_address = Column(String(58), nullable=False, index=True)
-    amount = Column(BigInteger, nullable=False)  # microAlgos
-    transaction_id = Column(String(52))  # Algorand txn ID
-    status = Column(String(20), nullable=False, index=True)  # pending, completed, failed
-    created_at = Column(DateTime, default=datetime.utcnow)
-    completed_at = Column(DateTime)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chain_settlement_id: Mapped[Optional[int]] = mapped_column(BigInteger, unique=True, index=True)
+    expense_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("expenses.id"), index=True)
+    from_address: Mapped[str] = mapped_column(String(58), nullable=False)
+    to_address: Mapped[str] = mapped_column(String(58), nullable=False)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)  # microAlgos
+    transaction_id: Mapped[Optional[str]] = mapped_column(String(52))  # Algorand txn ID
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # pending, completed, failed
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     
     # Relationships
-    expense = relationship("Expense")
+    # Never lazy-load: callers that need the expense must eager-load it
+    expense: Mapped[Optional["Expense"]] = relationship(lazy="raise_on_sql")
+    
+    # Indexes - one per side of the user's (from OR to) lookup,
+    # matching the optional status filter and recency ordering
+    __table_args__ = (
+        Index("ix_settlement_from_status_created", "from_address", "status", "created_at"),
+        Index("ix_settlement_to_status_created", "to_address", "status", "created_at"),
+    )
 
 
 class Transaction(Base):
     """Transaction log - indexed blockchain transactions"""
     __tablename__ = "transactions"
     
-    id = Column(Integer, primary_key=True)
-    transaction_id = Column(String(52), unique=True, nullable=False, index=True)
-    block_number = Column(BigInteger, index=True)
-    transaction_type = Column(String(50), nullable=False, index=True)
-    sender = Column(String(58), index=True)
-    receiver = Column(String(58), index=True)
-    amount = Column(BigInteger)
-    fee = Column(BigInteger)
-    note = Column(Text)
-    tx_metadata = Column(JSON)  # Store additional data (renamed from metadata to avoid SQLAlchemy conflict)
-    indexed_at = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    transaction_id: Mapped[str] = mapped_column(String(52), unique=True, nullable=False, index=True)
+    block_number: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)
+    transaction_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    sender: Mapped[Optional[str]] = mapped_column(String(58), index=True)
+    receiver: Mapped[Optional[str]] = mapped_column(String(58), index=True)
+    amount: Mapped[Optional[int]] = mapped_column(BigInteger)
+    fee: Mapped[Optional[int]] = mapped_column(BigInteger)
+    note: Mapped[Optional[str]] = mapped_column(Text)
+    # Store additional data (renamed from metadata to avoid SQLAlchemy conflict).
+    # JSONB on Postgres so containment lookups can use the GIN index below
+    tx_metadata: Mapped[Optional[Any]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))
+    indexed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    # Indexes
+    __table_args__ = (
+        Index(
+            "ix_tx_metadata_gin",
+            "tx_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"tx_metadata": "jsonb_path_ops"},
+        ),
+    )
 
 
 class Balance(Base):
     """Balance cache - quick access to group balances"""
     __tablename__ = "balances"
     
-    id = Column(Integer, primary_key=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
-    wallet_address = Column(String(58), nullable=False, index=True)
-    balance = Column(BigInteger, nullable=False)  # Net balance (+ = owed, - = owes)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    group_id: Mapped[int] = mapped_column(Integer, ForeignKey("groups.id"), nullable=False)
+    wallet_address: Mapped[str] = mapped_column(String(58), nullable=False, index=True)
+    balance: Mapped[int] = mapped_column(BigInteger, nullable=False)  # Net balance (+ = owed, - = owes)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    group = relationship("Group", back_populates="balances")
+    group: Mapped["Group"] = relationship(back_populates="balances")
     
     # Constraints
     __table_args__ = (
@@ -3,15 +3,34 @@ Pydantic schemas for API request/response validation
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, List, Optional, Dict, Any
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, model_validator
 from enum import Enum
 
+from algosdk.error import WrongChecksumError
+
+from app.utils.address import decode_address
+
+
+# ==================== Common Types ====================
+
+def _validate_algorand_address(value: str) -> str:
+    """Reject strings that are not checksummed Algorand addresses"""
+    try:
+        decode_address(value)
+    except (ValueError, WrongChecksumError):
+        raise ValueError("Invalid Algorand address")
+    return value
+
+
+# Validated once while parsing the request body, before any route code runs
+AlgorandAddress = Annotated[str, AfterValidator(_validate_algorand_address)]
+
 
 # ==================== User Schemas ====================
 
 class UserCreate(BaseModel):
-    wallet_address: str
+    wallet_address: AlgorandAddress
 
 
 class User(BaseModel):
@@ -26,17 +45,29 @@ class User(BaseModel):
 # ==================== Group Schemas ====================
 
 class GroupCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field("", max_length=500)
 
 
 class GroupUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
 
 
 class GroupMemberAdd(BaseModel):
-    wallet_address: str
+    model_config = ConfigDict(frozen=True)
+    
+    wallet_address: AlgorandAddress
+
+
+class GroupMembersAdd(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
+    wallet_addresses: List[AlgorandAddress] = Field(..., min_length=1, max_length=64)
 
 
 class Group(BaseModel):
@@ -72,42 +103,32 @@ class SplitType(str, Enum):
 
 
 class ExpenseSplit(BaseModel):
-    wallet_address: str
-    amount: int = Field(..., gt=0, description="Amount in microAlgos")
+    model_config = ConfigDict(frozen=True)
     
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError("Amount must be positive")
-        return v
+    wallet_address: AlgorandAddress
+    amount: int = Field(..., gt=0, description="Amount in microAlgos")
 
 
 class ExpenseCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     group_id: int
-    amount: int = Field(..., gt=0, description="Total amount in microAlgos")
+    # 1M ALGO max
+    amount: int = Field(..., gt=0, le=1_000_000_000_000, description="Total amount in microAlgos")
     description: str = Field(..., min_length=1, max_length=500)
     split_type: SplitType
     splits: Optional[List[ExpenseSplit]] = None  # Required for custom splits
     
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError("Amount must be positive")
-        if v > 1_000_000_000_000:  # 1M ALGO max
-            raise ValueError("Amount too large")
-        return v
-    
-    @validator('splits')
-    def validate_splits(cls, v, values):
-        if values.get('split_type') == SplitType.CUSTOM:
-            if not v:
+    @model_validator(mode="after")
+    def validate_splits(self):
+        if self.split_type == SplitType.CUSTOM:
+            if not self.splits:
                 raise ValueError("Splits required for custom split type")
             
-            total = sum(split.amount for split in v)
-            if total != values.get('amount'):
+            if sum(split.amount for split in self.splits) != self.amount:
                 raise ValueError("Splits must sum to total amount")
         
-        return v
+        return self
 
 
 class ExpenseUpdate(BaseModel):
@@ -151,15 +172,9 @@ class SettlementStatus(str, Enum):
 
 class SettlementInitiate(BaseModel):
     expense_id: Optional[int] = None
-    from_address: str
-    to_address: str
+    from_address: AlgorandAddress
+    to_address: AlgorandAddress
     amount: int = Field(..., gt=0)
-    
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError("Amount must be positive")
-        return v
 
 
 class SettlementExecute(BaseModel):
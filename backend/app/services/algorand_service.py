@@ -9,13 +9,29 @@ Handles all interactions with Algorand blockchain and smart contracts:
 Provides transaction simulation, retry logic, and comprehensive error handling.
 """
 
-import base64
+import asyncio
+import contextlib
+import copy
+import functools
 import hashlib
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+import struct
+import threading
+import time
+from urllib.parse import quote
+from typing import Awaitable, Callable, Optional, Dict, Any, List, Tuple, TypeVar, Union
 from dataclasses import dataclass
 
-from algosdk import transaction, account, encoding
+import httpx
+import msgpack
+import nacl.signing
+import orjson
+import pybase64
+from cachetools import TTLCache
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from algosdk import transaction, account, constants, encoding
+from algosdk.error import AlgodHTTPError
 from algosdk.v2client import algod, indexer
 from algosdk.atomic_transaction_composer import (
     AtomicTransactionComposer,
@@ -24,15 +40,174 @@ from algosdk.atomic_transaction_composer import (
 )
 
 from app.config import settings
+from app.utils.address import decode_address
 from app.utils.retry import retry_with_backoff
 from app.utils.errors import (
     AlgorandTransactionError,
+    AuthorizationError,
     SmartContractError,
-    InsufficientFundsError
+    InsufficientFundsError,
+    TransactionPendingError,
+    TransactionRejectedError,
+    ValidationError
 )
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Protocol limit on transactions per atomic group
+MAX_ATOMIC_GROUP_SIZE = 16
+
+# Seconds a fetched suggested_params result is reused
+SUGGESTED_PARAMS_TTL = 2.0
+
+# Seconds between background suggested_params refreshes; below the TTL so
+# transactions never wait on the fetch while the refresher is running
+SUGGESTED_PARAMS_REFRESH_INTERVAL = 1.5
+
+# Seconds a "not yet executed" settlement state is reused
+SETTLEMENT_PENDING_TTL = 5.0
+
+# Seconds an "executed" settlement state is kept; it never changes, the TTL
+# only bounds memory
+SETTLEMENT_EXECUTED_TTL = 3600.0
+
+# Seconds an account balance read from algod is reused
+ACCOUNT_BALANCE_TTL = 3.0
+
+# Most algod RPCs in flight at once, across all requests
+ALGOD_MAX_CONCURRENCY = 16
+
+# Seconds a single algod RPC may take before it is abandoned
+ALGOD_CALL_TIMEOUT = 10.0
+
+# Big-endian uint64, the encoding of every integer app argument and log value
+_U64 = struct.Struct("!Q")
+_PACK_U64 = _U64.pack
+_UNPACK_U64 = _U64.unpack
+
+# Low 63 bits of a sign-magnitude uint64 balance
+_MAGNITUDE_MASK = (1 << 63) - 1
+
+# ExpenseTracker group balances box: b"group_" + itob(id) + b"_balances",
+# holding 32-byte address + 8-byte sign-magnitude balance entries
+_BALANCES_BOX_PREFIX = b"group_"
+_BALANCES_BOX_SUFFIX = b"_balances"
+_BALANCE_ENTRY = struct.Struct("!32sQ")
+
+# Domain prefix algosdk adds to arbitrary signed bytes
+_SIGN_BYTES_PREFIX = b"MX"
+
+# Domain prefix for transaction signatures
+_TXID_PREFIX = b"TX"
+
+# Zero address; read-only dryruns need a sender but never sign
+_DRYRUN_SENDER = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+
+# Constant parts of the wallet login message
+_AUTH_PREFIX = b"AlgoCampus Login\nAddress: "
+_AUTH_NONCE = b"\nNonce: "
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_addr(address: str) -> bytes:
+    """32-byte public key for an address; memoized, group members repeat"""
+    return decode_address(address)
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_addr(public_key: bytes) -> str:
+    """Address for a 32-byte public key; memoized like _decode_addr"""
+    return encoding.encode_address(public_key)
+
+
+def _verify_ed25519(public_key: bytes, message: bytes, signature: bytes) -> bool:
+    """
+    Verify an Algorand "MX"-prefixed byte signature with OpenSSL's Ed25519.
+    
+    Same semantics as algosdk.encoding.verify_bytes, which prepends the
+    MX prefix before checking.
+    """
+    try:
+        Ed25519PublicKey.from_public_bytes(public_key).verify(
+            signature, _SIGN_BYTES_PREFIX + message
+        )
+        return True
+    except InvalidSignature:
+        return False
+
+
+def _sign_txn(txn: transaction.Transaction, private_key: str) -> transaction.SignedTransaction:
+    """
+    Sign a transaction directly with libsodium.
+    
+    Equivalent to txn.sign(private_key): Ed25519 over b"TX" + msgpack(txn),
+    with the signer recorded as auth address when the sender is rekeyed.
+    """
+    key = pybase64.b64decode(private_key)
+    message = _TXID_PREFIX + pybase64.b64decode(encoding.msgpack_encode(txn))
+    signature = nacl.signing.SigningKey(key[:32]).sign(message).signature
+    
+    signer = encoding.encode_address(key[32:])
+    return transaction.SignedTransaction(
+        txn,
+        pybase64.b64encode(signature).decode(),
+        authorizing_address=signer if signer != txn.sender else None
+    )
+
+
+def _sign_magnitude(encoded_balance: int) -> int:
+    """
+    Signed value of an ExpenseTracker balance.
+    
+    The contract stores sign-magnitude (bit 63 = sign), not two's complement.
+    """
+    magnitude = encoded_balance & _MAGNITUDE_MASK
+    return magnitude - ((encoded_balance >> 63) * 2 * magnitude)
+
+
+def _decode_balances_box(value: bytes) -> Dict[str, int]:
+    """Decode a group balances box into {address: signed balance}"""
+    return {
+        _encode_addr(public_key): _sign_magnitude(encoded_balance)
+        for public_key, encoded_balance in _BALANCE_ENTRY.iter_unpack(value)
+    }
+
+
+def _decode_logs(logs: Optional[List[str]]) -> List[bytes]:
+    """Decode base64 app-call logs as returned by algod"""
+    return list(map(pybase64.b64decode, logs)) if logs else []
+
+
+# Failures a retry can't fix or must not attempt: algod refused the
+# transaction, a submitted one may still land, or the request is invalid
+_NO_RETRY = (
+    TransactionRejectedError,
+    TransactionPendingError,
+    ValidationError,
+    AuthorizationError
+)
+
+
+def _contract_call(action: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Report a contract call's final failure as SmartContractError.
+    
+    Goes outside retry_with_backoff, so the retry loop still sees the
+    original exception type and can skip the non-retriable ones.
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logger.error("Failed to %s: %s", action, e)
+                raise SmartContractError(f"Failed to {action}: {str(e)}") from e
+        return wrapper
+    return decorator
+
 
 @dataclass
 class TransactionResult:
@@ -40,20 +215,93 @@ class TransactionResult:
     tx_id: str
     confirmed_round: int
     return_value: Optional[Any] = None
-    logs: Optional[List[bytes]] = None
+    raw_logs: Optional[List[str]] = None  # Base64, decoded on access
+    
+    @property
+    def logs(self) -> List[bytes]:
+        """All log entries, decoded"""
+        return _decode_logs(self.raw_logs)
     
     def decode_log(self, index: int = 0) -> Optional[int]:
         """Decode a log entry as integer (e.g., settlement_id)"""
-        if self.logs and len(self.logs) > index:
-            return int.from_bytes(self.logs[index], "big")
-        return None
+        if not self.raw_logs:
+            return None
+        try:
+            value = pybase64.b64decode(self.raw_logs[index], validate=True)
+        except IndexError:
+            return None
+        
+        # Contract IDs and amounts are logged as 8-byte uint64s
+        if len(value) == 8:
+            return _UNPACK_U64(value)[0]
+        return int.from_bytes(value, "big")
+
+
+class _PooledAlgodClient(algod.AlgodClient):
+    """
+    AlgodClient that reuses keep-alive HTTP/2 connections.
+    
+    The stock client opens a new urllib connection per request; this one
+    sends every SDK call over a shared httpx pool (safe across the worker
+    threads the calls run on) and parses JSON with orjson.
+    """
+    
+    def __init__(self, algod_token: str, algod_address: str):
+        super().__init__(algod_token, algod_address)
+        self.session = httpx.Client(
+            http2=True,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30)
+        )
+    
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: Optional[str] = "json",
+        timeout: Optional[float] = None
+    ) -> Any:
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        header[constants.algod_auth_header] = self.algod_token
+        
+        if requrl not in constants.unversioned_paths:
+            requrl = "/v2" + requrl
+        
+        response = self.session.request(
+            method,
+            self.algod_address + requrl,
+            params=params,
+            content=data,
+            headers=header,
+            # SDK methods forward an optional per-call timeout; otherwise the pool's
+            timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        )
+        
+        if response.is_error:
+            try:
+                message = orjson.loads(response.content)["message"]
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                message = response.text
+            raise AlgodHTTPError(message, response.status_code)
+        
+        if response_format == "json":
+            # The SDK returns an empty dict for an empty body
+            return orjson.loads(response.content) if response.content else {}
+        return response.content
 
 
 class AlgorandService:
     """Service for interacting with Algorand blockchain and smart contracts"""
     
     def __init__(self):
-        self.algod_client = algod.AlgodClient(
+        self.algod_client = _PooledAlgodClient(
             settings.ALGORAND_ALGOD_TOKEN,
             settings.ALGORAND_ALGOD_URL
         )
@@ -62,20 +310,340 @@ class AlgorandService:
             settings.ALGORAND_INDEXER_URL
         )
         
+        # Pooled keep-alive client for plain REST reads, attached at app startup.
+        # The SDK clients above open a new connection per call.
+        self.http: Optional[httpx.AsyncClient] = None
+        
+        # Cap on concurrent algod RPCs, so a burst of requests can't open
+        # hundreds of sockets against the node; created on first use so it
+        # belongs to the running loop
+        self._algo_sem: Optional[asyncio.Semaphore] = None
+        
+        # (fetched_at, params) from the last suggested_params call
+        self._sp_cache: Tuple[float, Optional[transaction.SuggestedParams]] = (0.0, None)
+        self._sp_refresh_task: Optional[asyncio.Task] = None
+        
+        # Executed settlements stay executed, so positive answers are kept
+        # long; negative answers are only trusted for a few seconds
+        self._executed_settlements: TTLCache = TTLCache(
+            maxsize=65536, ttl=SETTLEMENT_EXECUTED_TTL
+        )
+        self._pending_settlements: TTLCache = TTLCache(
+            maxsize=4096, ttl=SETTLEMENT_PENDING_TTL
+        )
+        
+        # Recently read account balances; dropped when this service debits one
+        self._account_balances: TTLCache = TTLCache(
+            maxsize=4096, ttl=ACCOUNT_BALANCE_TTL
+        )
+        
         self.group_manager_app_id = settings.GROUP_MANAGER_APP_ID
         self.expense_tracker_app_id = settings.EXPENSE_TRACKER_APP_ID
         self.settlement_executor_app_id = settings.SETTLEMENT_EXECUTOR_APP_ID
         
-        logger.info(f"Algorand Service initialized")
-        logger.info(f"GroupManager App ID: {self.group_manager_app_id}")
-        logger.info(f"ExpenseTracker App ID: {self.expense_tracker_app_id}")
-        logger.info(f"SettlementExecutor App ID: {self.settlement_executor_app_id}")
+        if msgpack.Packer.__module__ == "msgpack.fallback":
+            logger.warning(
+                "msgpack C extension not available; transaction encoding "
+                "is running on the pure-Python fallback"
+            )
+        
+        logger.info("Algorand Service initialized")
+        logger.info("GroupManager App ID: %s", self.group_manager_app_id)
+        logger.info("ExpenseTracker App ID: %s", self.expense_tracker_app_id)
+        logger.info("SettlementExecutor App ID: %s", self.settlement_executor_app_id)
+    
+    async def _submit_atomic_batches(
+        self,
+        txns: List[transaction.Transaction],
+        private_key: str
+    ) -> List[TransactionResult]:
+        """
+        Submit independent transactions from one sender as atomic groups.
+        
+        Transactions are chunked into groups of up to MAX_ATOMIC_GROUP_SIZE,
+        each group sent in a single submission. Every group
+        confirms in one round, so N transactions cost ceil(N/16)
+        confirmation waits instead of N.
+        """
+        results = []
+        
+        for start in range(0, len(txns), MAX_ATOMIC_GROUP_SIZE):
+            chunk = transaction.assign_group_id(txns[start:start + MAX_ATOMIC_GROUP_SIZE])
+            signed = [_sign_txn(txn, private_key) for txn in chunk]
+            tx_ids = [txn.get_txid() for txn in chunk]
+            
+            await self._send_signed(signed)
+            logger.info("Atomic batch of %s transactions sent: %s...", len(signed), tx_ids[0])
+            
+            # The whole group lands in one round; after the first confirmation
+            # the remaining lookups return immediately
+            for tx_id in tx_ids:
+                result = await self._wait_for_confirmation(tx_id, 4)
+                results.append(TransactionResult(
+                    tx_id=tx_id,
+                    confirmed_round=result["confirmed-round"],
+                    raw_logs=result.get("logs")
+                ))
+        
+        return results
+    
+    def _algod_slots(self) -> asyncio.Semaphore:
+        if self._algo_sem is None:
+            self._algo_sem = asyncio.Semaphore(ALGOD_MAX_CONCURRENCY)
+        return self._algo_sem
+    
+    async def _algod_thread(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        timeout: float = ALGOD_CALL_TIMEOUT
+    ) -> T:
+        """
+        Run a blocking SDK call under the algod concurrency cap.
+        
+        A timed-out caller stops waiting, but the worker thread can't be
+        cancelled; its slot is released only when the thread finishes,
+        so abandoned calls still count against the cap.
+        """
+        slots = self._algod_slots()
+        await slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    
+    async def _get_sp(self) -> transaction.SuggestedParams:
+        """
+        Suggested params, refetched at most every SUGGESTED_PARAMS_TTL seconds.
+        
+        Rounds are ~3.3s and params stay valid for 1000 rounds, so a
+        short-lived copy is safe to share between transactions.
+        """
+        fetched_at, sp = self._sp_cache
+        now = time.monotonic()
+        if sp is None or now - fetched_at > SUGGESTED_PARAMS_TTL:
+            sp = await self._algod_thread(self.algod_client.suggested_params)
+            self._sp_cache = (now, sp)
+        return copy.copy(sp)
+    
+    async def _refresh_sp_loop(self, interval: float) -> None:
+        """Keep the suggested params cache fresh until cancelled"""
+        while True:
+            try:
+                sp = await self._algod_thread(self.algod_client.suggested_params)
+                self._sp_cache = (time.monotonic(), sp)
+            except Exception as e:
+                # _get_sp falls back to fetching inline once the cache expires
+                logger.warning("Suggested params refresh failed: %s", e)
+            await asyncio.sleep(interval)
+    
+    def start_params_refresh(self, interval: float = SUGGESTED_PARAMS_REFRESH_INTERVAL) -> None:
+        """Start refreshing suggested params in the background"""
+        if self._sp_refresh_task is None:
+            self._sp_refresh_task = asyncio.create_task(self._refresh_sp_loop(interval))
+    
+    async def stop_params_refresh(self) -> None:
+        """Stop the background suggested params refresh"""
+        task, self._sp_refresh_task = self._sp_refresh_task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    
+    def attach_http_client(self, client: httpx.AsyncClient) -> None:
+        """Use an app-scoped HTTP client for algod/indexer REST calls"""
+        self.http = client
+    
+    async def warm_up(self) -> None:
+        """Open the pooled algod connection ahead of the first request"""
+        try:
+            await self.http.get(f"{settings.ALGORAND_ALGOD_URL}/health")
+        except httpx.HTTPError as e:
+            logger.warning("algod warm-up failed: %s", e)
+    
+    async def _algod_get(self, path: str) -> Dict[str, Any]:
+        """GET an algod REST endpoint over the pooled client, under the concurrency cap"""
+        async with self._algod_slots():
+            response = await asyncio.wait_for(
+                self.http.get(
+                    f"{settings.ALGORAND_ALGOD_URL}{path}",
+                    headers={"X-Algo-API-Token": settings.ALGORAND_ALGOD_TOKEN}
+                ),
+                ALGOD_CALL_TIMEOUT
+            )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    async def _algod_post(self, path: str, content: bytes) -> Dict[str, Any]:
+        """POST raw msgpack bytes to an algod REST endpoint, under the concurrency cap"""
+        async with self._algod_slots():
+            response = await asyncio.wait_for(
+                self.http.post(
+                    f"{settings.ALGORAND_ALGOD_URL}{path}",
+                    content=content,
+                    headers={
+                        "X-Algo-API-Token": settings.ALGORAND_ALGOD_TOKEN,
+                        "Content-Type": "application/x-binary"
+                    }
+                ),
+                ALGOD_CALL_TIMEOUT
+            )
+        if response.is_error:
+            # algod puts the rejection reason (e.g. overspend, logic error) in
+            # the body; a 4xx is final, a 5xx may succeed on retry
+            error_class = (
+                TransactionRejectedError if response.is_client_error
+                else AlgorandTransactionError
+            )
+            raise error_class(
+                f"algod rejected transaction: {response.text}",
+                details={"status": response.status_code}
+            )
+        return orjson.loads(response.content)
+    
+    async def _send_signed(self, signed: List[transaction.SignedTransaction]) -> str:
+        """
+        Submit one signed transaction or an atomic group; returns the first txid.
+        
+        Goes straight to POST /v2/transactions on the pooled client; the SDK
+        is only used to sign and serialize. If the submit fails without a
+        rejection (timeout, dropped connection) it may still have reached
+        algod, so the txid is looked up before the failure is reported.
+        """
+        tx_id = signed[0].transaction.get_txid()
+        
+        try:
+            if self.http is None:
+                await self._algod_thread(self.algod_client.send_transactions, signed)
+            else:
+                body = b"".join(
+                    pybase64.b64decode(encoding.msgpack_encode(txn)) for txn in signed
+                )
+                await self._algod_post("/v2/transactions", body)
+        except TransactionRejectedError:
+            raise
+        except AlgodHTTPError as e:
+            if e.code is not None and 400 <= e.code < 500:
+                raise TransactionRejectedError(
+                    f"algod rejected transaction: {e}", details={"status": e.code}
+                ) from e
+            if not await self._is_submitted(tx_id):
+                raise
+            logger.warning("Submit of %s failed after reaching algod: %s", tx_id, e)
+        except Exception as e:
+            if not await self._is_submitted(tx_id):
+                raise
+            logger.warning("Submit of %s failed after reaching algod: %s", tx_id, e)
+        
+        return tx_id
+    
+    async def _is_submitted(self, tx_id: str) -> bool:
+        """
+        Whether algod knows a transaction (pooled or recently confirmed).
+        
+        Raises:
+            TransactionPendingError: If the lookup itself fails; the
+                transaction may have landed and must not be resubmitted
+        """
+        try:
+            if self.http is None:
+                await self._algod_thread(self.algod_client.pending_transaction_info, tx_id)
+            else:
+                await self._algod_get(f"/v2/transactions/pending/{tx_id}")
+            return True
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return False
+            lookup_error = e
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return False
+            lookup_error = e
+        except Exception as e:
+            lookup_error = e
+        
+        raise TransactionPendingError(
+            f"Transaction {tx_id} may have been submitted: {lookup_error}",
+            details={"tx_id": tx_id}
+        ) from lookup_error
+    
+    async def _wait_for_confirmation(self, tx_id: str, max_rounds: int) -> Dict[str, Any]:
+        """
+        Wait until a submitted transaction is confirmed, for at most max_rounds rounds.
+        
+        Returns:
+            Pending transaction info, as from algod's pending endpoint
+        
+        Raises:
+            TransactionRejectedError: If algod dropped the transaction from its pool
+            TransactionPendingError: If confirmation couldn't be observed; the
+                transaction may still land, so callers must not resubmit it
+        """
+        # Each poll is its own capped call, so a confirmation wait never
+        # holds a concurrency slot for more than one round
+        if self.http is None:
+            get_status = functools.partial(self._algod_thread, self.algod_client.status)
+            get_pending = functools.partial(
+                self._algod_thread, self.algod_client.pending_transaction_info, tx_id
+            )
+            wait_for_block = functools.partial(
+                self._algod_thread, self.algod_client.status_after_block
+            )
+        else:
+            get_status = functools.partial(self._algod_get, "/v2/status")
+            get_pending = functools.partial(self._algod_get, f"/v2/transactions/pending/{tx_id}")
+            
+            async def wait_for_block(round_num: int) -> Dict[str, Any]:
+                return await self._algod_get(f"/v2/status/wait-for-block-after/{round_num}")
+        
+        try:
+            status = await get_status()
+            current_round = status["last-round"]
+            
+            for _ in range(max_rounds + 1):
+                info = await get_pending()
+                if info.get("confirmed-round", 0) > 0:
+                    return info
+                if info.get("pool-error"):
+                    raise TransactionRejectedError(
+                        f"Transaction {tx_id} rejected: {info['pool-error']}"
+                    )
+                
+                # Long-poll: algod answers once the next block is sealed
+                status = await wait_for_block(current_round)
+                current_round = status["last-round"]
+        except TransactionRejectedError:
+            raise
+        except Exception as e:
+            raise TransactionPendingError(
+                f"Transaction {tx_id} submitted but not confirmed: {e}",
+                details={"tx_id": tx_id}
+            ) from e
+        
+        raise TransactionPendingError(
+            f"Transaction {tx_id} not confirmed after {max_rounds} rounds",
+            details={"tx_id": tx_id}
+        )
+    
+    async def _indexer_get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET an indexer REST endpoint over the pooled client"""
+        response = await self.http.get(
+            f"{settings.ALGORAND_INDEXER_URL}{path}",
+            params=params,
+            headers={"X-Indexer-API-Token": settings.ALGORAND_INDEXER_TOKEN}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     # ========================================================================
     # WALLET & AUTHENTICATION
     # ========================================================================
     
-    def generate_auth_message(self, wallet_address: str, nonce: str) -> str:
+    def generate_auth_message(self, wallet_address: str, nonce: str) -> bytes:
         """
         Generate message for wallet signature verification.
         
@@ -84,14 +652,14 @@ class AlgorandService:
             nonce: Random nonce from database
         
         Returns:
-            Message to be signed by user's wallet
+            UTF-8 message bytes to be signed by user's wallet
         """
-        return f"AlgoCampus Login\nAddress: {wallet_address}\nNonce: {nonce}"
+        return _AUTH_PREFIX + wallet_address.encode() + _AUTH_NONCE + nonce.encode()
     
     def verify_signature(
         self,
         wallet_address: str,
-        message: str,
+        message: Union[str, bytes],
         signature: str
     ) -> bool:
         """
@@ -99,7 +667,7 @@ class AlgorandService:
         
         Args:
             wallet_address: Expected signer address
-            message: Original message
+            message: Original message (bytes from generate_auth_message, or str)
             signature: Base64-encoded signature
         
         Returns:
@@ -107,27 +675,29 @@ class AlgorandService:
         """
         try:
             # Decode signature
-            sig_bytes = base64.b64decode(signature)
+            sig_bytes = pybase64.b64decode(signature, validate=True)
             
             # Get public key from address
-            public_key = encoding.decode_address(wallet_address)
+            public_key = _decode_addr(wallet_address)
             
             # Verify signature
-            message_bytes = message.encode('utf-8')
-            is_valid = encoding.verify_bytes(message_bytes, sig_bytes, public_key)
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            is_valid = _verify_ed25519(public_key, message, sig_bytes)
             
-            logger.info(f"Signature verification for {wallet_address}: {is_valid}")
+            logger.info("Signature verification for %s: %s", wallet_address, is_valid)
             return is_valid
             
         except Exception as e:
-            logger.error(f"Signature verification error: {e}")
+            logger.error("Signature verification error: %s", e)
             return False
     
     # ========================================================================
     # GROUP MANAGER CONTRACT
     # ========================================================================
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("create group")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def create_group(
         self,
         admin_address: str,
@@ -150,47 +720,40 @@ class AlgorandService:
         Raises:
             SmartContractError: If contract call fails
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            # Build app call transaction
-            txn = transaction.ApplicationCallTxn(
-                sender=admin_address,
-                sp=sp,
-                index=self.group_manager_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"create_group",
-                    name.encode('utf-8'),
-                    description.encode('utf-8')
-                ]
-            )
-            
-            # Sign transaction
-            signed_txn = txn.sign(admin_private_key)
-            
-            # Send transaction
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            logger.info(f"Create group transaction sent: {tx_id}")
-            
-            # Wait for confirmation
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            # Extract group_id from logs
-            logs = result.get("logs", [])
-            decoded_logs = [base64.b64decode(log) for log in logs] if logs else []
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"],
-                logs=decoded_logs
-            )
-            
-        except Exception as e:
-            logger.error(f"Create group failed: {e}")
-            raise SmartContractError(f"Failed to create group: {str(e)}")
+        sp = await self._get_sp()
+        
+        # Build app call transaction
+        txn = transaction.ApplicationCallTxn(
+            sender=admin_address,
+            sp=sp,
+            index=self.group_manager_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"create_group",
+                name.encode('utf-8'),
+                description.encode('utf-8')
+            ]
+        )
+        
+        # Sign transaction
+        signed_txn = _sign_txn(txn, admin_private_key)
+        
+        # Send transaction
+        tx_id = await self._send_signed([signed_txn])
+        logger.info("Create group transaction sent: %s", tx_id)
+        
+        # Wait for confirmation
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        # group_id is log 0; decoded lazily via decode_log
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"],
+            raw_logs=result.get("logs")
+        )
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("add member")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def add_group_member(
         self,
         admin_address: str,
@@ -210,38 +773,74 @@ class AlgorandService:
         Returns:
             TransactionResult
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            txn = transaction.ApplicationCallTxn(
+        sp = await self._get_sp()
+        
+        txn = transaction.ApplicationCallTxn(
+            sender=admin_address,
+            sp=sp,
+            index=self.group_manager_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"add_member",
+                _PACK_U64(group_id),
+                _decode_addr(member_address)
+            ]
+        )
+        
+        signed_txn = _sign_txn(txn, admin_private_key)
+        tx_id = await self._send_signed([signed_txn])
+        
+        logger.info("Add member transaction sent: %s", tx_id)
+        
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"]
+        )
+    
+    # Not retried as a whole: groups already confirmed would be resubmitted
+    @_contract_call("add members")
+    async def add_group_members_batch(
+        self,
+        admin_address: str,
+        admin_private_key: str,
+        group_id: int,
+        members: List[str]
+    ) -> List[TransactionResult]:
+        """
+        Add several members to a group with batched submission.
+        
+        Args:
+            admin_address: Group admin address
+            admin_private_key: Admin's private key
+            group_id: On-chain group ID
+            members: Member addresses to add
+        
+        Returns:
+            TransactionResult per member, in input order
+        """
+        sp = await self._get_sp()
+        
+        txns = [
+            transaction.ApplicationCallTxn(
                 sender=admin_address,
                 sp=sp,
                 index=self.group_manager_app_id,
                 on_complete=transaction.OnComplete.NoOpOC,
                 app_args=[
                     b"add_member",
-                    group_id.to_bytes(8, 'big'),
-                    encoding.decode_address(member_address)
+                    _PACK_U64(group_id),
+                    _decode_addr(member_address)
                 ]
             )
-            
-            signed_txn = txn.sign(admin_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            
-            logger.info(f"Add member transaction sent: {tx_id}")
-            
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"]
-            )
-            
-        except Exception as e:
-            logger.error(f"Add member failed: {e}")
-            raise SmartContractError(f"Failed to add member: {str(e)}")
+            for member_address in members
+        ]
+        
+        return await self._submit_atomic_batches(txns, admin_private_key)
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("generate QR invite")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def generate_qr_invite(
         self,
         admin_address: str,
@@ -261,40 +860,36 @@ class AlgorandService:
         Returns:
             Tuple of (invite_hash, TransactionResult)
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            txn = transaction.ApplicationCallTxn(
-                sender=admin_address,
-                sp=sp,
-                index=self.group_manager_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"generate_qr_invite_hash",
-                    group_id.to_bytes(8, 'big'),
-                    validity_seconds.to_bytes(8, 'big')
-                ]
-            )
-            
-            signed_txn = txn.sign(admin_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            # Extract invite hash from logs
-            logs = result.get("logs", [])
-            invite_hash = base64.b64decode(logs[0]).hex() if logs else ""
-            
-            return invite_hash, TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"]
-            )
-            
-        except Exception as e:
-            logger.error(f"Generate QR invite failed: {e}")
-            raise SmartContractError(f"Failed to generate QR invite: {str(e)}")
+        sp = await self._get_sp()
+        
+        txn = transaction.ApplicationCallTxn(
+            sender=admin_address,
+            sp=sp,
+            index=self.group_manager_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"generate_qr_invite_hash",
+                _PACK_U64(group_id),
+                _PACK_U64(validity_seconds)
+            ]
+        )
+        
+        signed_txn = _sign_txn(txn, admin_private_key)
+        tx_id = await self._send_signed([signed_txn])
+        
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        # Extract invite hash from logs
+        logs = result.get("logs", [])
+        invite_hash = pybase64.b64decode(logs[0], validate=True).hex() if logs else ""
+        
+        return invite_hash, TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"]
+        )
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("join group")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def join_group_via_qr(
         self,
         member_address: str,
@@ -312,42 +907,38 @@ class AlgorandService:
         Returns:
             TransactionResult
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            # Convert hex hash to bytes
-            invite_bytes = bytes.fromhex(invite_hash)
-            
-            txn = transaction.ApplicationCallTxn(
-                sender=member_address,
-                sp=sp,
-                index=self.group_manager_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"join_group_via_qr",
-                    invite_bytes
-                ]
-            )
-            
-            signed_txn = txn.sign(member_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"]
-            )
-            
-        except Exception as e:
-            logger.error(f"Join group via QR failed: {e}")
-            raise SmartContractError(f"Failed to join group: {str(e)}")
+        sp = await self._get_sp()
+        
+        # Convert hex hash to bytes
+        invite_bytes = bytes.fromhex(invite_hash)
+        
+        txn = transaction.ApplicationCallTxn(
+            sender=member_address,
+            sp=sp,
+            index=self.group_manager_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"join_group_via_qr",
+                invite_bytes
+            ]
+        )
+        
+        signed_txn = _sign_txn(txn, member_private_key)
+        tx_id = await self._send_signed([signed_txn])
+        
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"]
+        )
     
     # ========================================================================
  # EXPENSE TRACKER CONTRACT
     # ========================================================================
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("add expense")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def add_expense(
         self,
         payer_address: str,
@@ -371,47 +962,37 @@ class AlgorandService:
         Returns:
             TransactionResult with expense_id in logs
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            # Pack member addresses (32 bytes each)
-            split_bytes = b"".join([
-                encoding.decode_address(addr) for addr in split_with
-            ])
-            
-            txn = transaction.ApplicationCallTxn(
-                sender=payer_address,
-                sp=sp,
-                index=self.expense_tracker_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"add_expense",
-                    group_id.to_bytes(8, 'big'),
-                    amount.to_bytes(8, 'big'),
-                    note.encode('utf-8'),
-                    split_bytes
-                ]
-            )
-            
-            signed_txn = txn.sign(payer_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            
-            logger.info(f"Add expense transaction sent: {tx_id}")
-            
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            logs = result.get("logs", [])
-            decoded_logs = [base64.b64decode(log) for log in logs] if logs else []
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"],
-                logs=decoded_logs
-            )
-            
-        except Exception as e:
-            logger.error(f"Add expense failed: {e}")
-            raise SmartContractError(f"Failed to add expense: {str(e)}")
+        sp = await self._get_sp()
+        
+        # Pack member addresses (32 bytes each)
+        split_bytes = b"".join(map(_decode_addr, split_with))
+        
+        txn = transaction.ApplicationCallTxn(
+            sender=payer_address,
+            sp=sp,
+            index=self.expense_tracker_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"add_expense",
+                _PACK_U64(group_id),
+                _PACK_U64(amount),
+                note.encode('utf-8'),
+                split_bytes
+            ]
+        )
+        
+        signed_txn = _sign_txn(txn, payer_private_key)
+        tx_id = await self._send_signed([signed_txn])
+        
+        logger.info("Add expense transaction sent: %s", tx_id)
+        
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"],
+            raw_logs=result.get("logs")
+        )
     
     async def get_user_balance(
         self,
@@ -429,52 +1010,62 @@ class AlgorandService:
             Balance in microAlgos (positive = owed, negative = owes)
         """
         try:
-            # This is a read-only call (dryrun)
-            sp = self.algod_client.suggested_params()
-            
-            txn = transaction.ApplicationCallTxn(
-                sender=user_address,
-                sp=sp,
-                index=self.expense_tracker_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"get_user_balance",
-                    group_id.to_bytes(8, 'big'),
-                    encoding.decode_address(user_address)
-                ]
-            )
-            
-            # Use dryrun for read-only operation (doesn't cost fees)
-            dryrun_result = self.algod_client.dryrun(txn)
-            
-            # Extract return value
-            if dryrun_result and "txns" in dryrun_result:
-                app_call_result = dryrun_result["txns"][0]
-                if "logs" in app_call_result:
-                    # Decode signed balance
-                    encoded_balance = int.from_bytes(
-                        base64.b64decode(app_call_result["logs"][0]),
-                        "big"
-                    )
-                    
-                    # Decode signed integer (as per ExpenseTracker contract)
-                    SIGN_BIT = 2 ** 63
-                    if encoded_balance < SIGN_BIT:
-                        return encoded_balance  # Positive
-                    else:
-                        return -(encoded_balance - SIGN_BIT)  # Negative
-            
-            return 0
+            balances = await self.get_group_balances(group_id)
+            return balances.get(user_address, 0)
             
         except Exception as e:
-            logger.error(f"Get user balance failed: {e}")
+            logger.error("Get user balance failed: %s", e)
             return 0
     
+    async def get_group_balances(self, group_id: int) -> Dict[str, int]:
+        """
+        Get every member's balance in a group with a single box read.
+        
+        The ExpenseTracker keeps a group's balances in one box, so this
+        fetches it once and decodes all entries locally.
+        
+        Args:
+            group_id: On-chain group ID
+        
+        Returns:
+            Mapping of address to balance in microAlgos; members without
+            an entry are absent (their balance is 0)
+        
+        Raises:
+            httpx.HTTPStatusError, AlgodHTTPError: If algod cannot serve the box
+        """
+        box_name = _BALANCES_BOX_PREFIX + _PACK_U64(group_id) + _BALANCES_BOX_SUFFIX
+        
+        try:
+            if self.http is not None:
+                box = await self._algod_get(
+                    f"/v2/applications/{self.expense_tracker_app_id}/box"
+                    f"?name=b64:{quote(pybase64.b64encode(box_name).decode(), safe='')}"
+                )
+            else:
+                box = await self._algod_thread(
+                    self.algod_client.application_box_by_name,
+                    self.expense_tracker_app_id,
+                    box_name
+                )
+        except httpx.HTTPStatusError as e:
+            # No box until the group's first expense
+            if e.response.status_code == 404:
+                return {}
+            raise
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return {}
+            raise
+        
+        return _decode_balances_box(pybase64.b64decode(box["value"]))
+    
     # ========================================================================
     # SETTLEMENT EXECUTOR CONTRACT
     # ========================================================================
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("initiate settlement")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def initiate_settlement(
         self,
         debtor_address: str,
@@ -500,46 +1091,39 @@ class AlgorandService:
         Returns:
             TransactionResult with settlement_id in logs
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            txn = transaction.ApplicationCallTxn(
-                sender=debtor_address,
-                sp=sp,
-                index=self.settlement_executor_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"initiate_settlement",
-                    expense_id.to_bytes(8, 'big'),
-                    group_id.to_bytes(8, 'big'),
-                    encoding.decode_address(debtor_address),
-                    encoding.decode_address(creditor_address),
-                    amount.to_bytes(8, 'big'),
-                    note.encode('utf-8')
-                ]
-            )
-            
-            signed_txn = txn.sign(debtor_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            
-            logger.info(f"Initiate settlement transaction sent: {tx_id}")
-            
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            logs = result.get("logs", [])
-            decoded_logs = [base64.b64decode(log) for log in logs] if logs else []
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"],
-                logs=decoded_logs
-            )
-            
-        except Exception as e:
-            logger.error(f"Initiate settlement failed: {e}")
-            raise SmartContractError(f"Failed to initiate settlement: {str(e)}")
+        sp = await self._get_sp()
+        
+        txn = transaction.ApplicationCallTxn(
+            sender=debtor_address,
+            sp=sp,
+            index=self.settlement_executor_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"initiate_settlement",
+                _PACK_U64(expense_id),
+                _PACK_U64(group_id),
+                _decode_addr(debtor_address),
+                _decode_addr(creditor_address),
+                _PACK_U64(amount),
+                note.encode('utf-8')
+            ]
+        )
+        
+        signed_txn = _sign_txn(txn, debtor_private_key)
+        tx_id = await self._send_signed([signed_txn])
+        
+        logger.info("Initiate settlement transaction sent: %s", tx_id)
+        
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"],
+            raw_logs=result.get("logs")
+        )
     
-    @retry_with_backoff(max_retries=3, backoff=1.0)
+    @_contract_call("execute settlement")
+    @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=_NO_RETRY)
     async def execute_settlement(
         self,
         debtor_address: str,
@@ -563,54 +1147,56 @@ class AlgorandService:
         Returns:
             TransactionResult
         """
-        try:
-            sp = self.algod_client.suggested_params()
-            
-            # Transaction 0: Payment
-            payment_txn = transaction.PaymentTxn(
-                sender=debtor_address,
-                receiver=creditor_address,
-                amt=amount,
-                sp=sp
-            )
-            
-            # Transaction 1: AppCall
-            app_call_txn = transaction.ApplicationCallTxn(
-                sender=debtor_address,
-                sp=sp,
-                index=self.settlement_executor_app_id,
-                on_complete=transaction.OnComplete.NoOpOC,
-                app_args=[
-                    b"execute_settlement",
-                    settlement_id.to_bytes(8, 'big')
-                ]
-            )
-            
-            # Create atomic group
-            gid = transaction.calculate_group_id([payment_txn, app_call_txn])
-            payment_txn.group = gid
-            app_call_txn.group = gid
-            
-            # Sign both transactions
-            signed_payment = payment_txn.sign(debtor_private_key)
-            signed_app_call = app_call_txn.sign(debtor_private_key)
-            
-            # Send atomic group
-            tx_id = self.algod_client.send_transactions([signed_payment, signed_app_call])
-            
-            logger.info(f"Execute settlement atomic group sent: {tx_id}")
-            
-            # Wait for confirmation
-            result = transaction.wait_for_confirmation(self.algod_client, tx_id, 4)
-            
-            return TransactionResult(
-                tx_id=tx_id,
-                confirmed_round=result["confirmed-round"]
-            )
-            
-        except Exception as e:
-            logger.error(f"Execute settlement failed: {e}")
-            raise SmartContractError(f"Failed to execute settlement: {str(e)}")
+        sp = await self._get_sp()
+        
+        # Transaction 0: Payment
+        payment_txn = transaction.PaymentTxn(
+            sender=debtor_address,
+            receiver=creditor_address,
+            amt=amount,
+            sp=sp
+        )
+        
+        # Transaction 1: AppCall
+        app_call_txn = transaction.ApplicationCallTxn(
+            sender=debtor_address,
+            sp=sp,
+            index=self.settlement_executor_app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[
+                b"execute_settlement",
+                _PACK_U64(settlement_id)
+            ]
+        )
+        
+        # Create atomic group
+        gid = transaction.calculate_group_id([payment_txn, app_call_txn])
+        payment_txn.group = gid
+        app_call_txn.group = gid
+        
+        # Sign inline: each Ed25519 signature takes microseconds, less
+        # than a thread handoff would cost
+        signed_payment = _sign_txn(payment_txn, debtor_private_key)
+        signed_app_call = _sign_txn(app_call_txn, debtor_private_key)
+        
+        # Send atomic group
+        tx_id = await self._send_signed([signed_payment, signed_app_call])
+        
+        logger.info("Execute settlement atomic group sent: %s", tx_id)
+        
+        # Wait for confirmation
+        result = await self._wait_for_confirmation(tx_id, 4)
+        
+        # The payment debited the debtor, and the settlement is now final
+        self._account_balances.pop(debtor_address, None)
+        if settlement_id:
+            self._pending_settlements.pop(settlement_id, None)
+            self._executed_settlements[settlement_id] = True
+        
+        return TransactionResult(
+            tx_id=tx_id,
+            confirmed_round=result["confirmed-round"]
+        )
     
     async def get_settlement_status(
         self,
@@ -625,37 +1211,47 @@ class AlgorandService:
         Returns:
             True if executed, False otherwise
         """
+        # Off-chain settlements all carry id 0, so that id is never cached
+        cacheable = settlement_id != 0
+        if cacheable:
+            if settlement_id in self._executed_settlements:
+                return True
+            if settlement_id in self._pending_settlements:
+                return False
+        
         try:
             # Read-only call
-            sp = self.algod_client.suggested_params()
-            
-            # We need a dummy sender for dryrun
-            dummy_sender = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+            sp = await self._get_sp()
             
             txn = transaction.ApplicationCallTxn(
-                sender=dummy_sender,
+                sender=_DRYRUN_SENDER,
                 sp=sp,
                 index=self.settlement_executor_app_id,
                 on_complete=transaction.OnComplete.NoOpOC,
                 app_args=[
                     b"verify_settlement_state",
-                    settlement_id.to_bytes(8, 'big')
+                    _PACK_U64(settlement_id)
                 ]
             )
             
-            dryrun_result = self.algod_client.dryrun(txn)
+            dryrun_result = await self._algod_thread(self.algod_client.dryrun, txn)
             
             if dryrun_result and "txns" in dryrun_result:
                 app_call_result = dryrun_result["txns"][0]
                 if "logs" in app_call_result:
                     # First byte: 0 = False, 1 = True
-                    executed = base64.b64decode(app_call_result["logs"][0])[0] == 1
+                    executed = pybase64.b64decode(app_call_result["logs"][0], validate=True)[0] == 1
+                    if cacheable:
+                        if executed:
+                            self._executed_settlements[settlement_id] = True
+                        else:
+                            self._pending_settlements[settlement_id] = True
                     return executed
             
             return False
             
         except Exception as e:
-            logger.error(f"Get settlement status failed: {e}")
+            logger.error("Get settlement status failed: %s", e)
             return False
     
     # ========================================================================
@@ -676,7 +1272,7 @@ class AlgorandService:
             Simulation result with cost, status, etc.
         """
         try:
-            dryrun_result = self.algod_client.dryrun(unsigned_txn)
+            dryrun_result = await self._algod_thread(self.algod_client.dryrun, unsigned_txn)
             
             return {
                 "success": True,
@@ -685,7 +1281,7 @@ class AlgorandService:
             }
             
         except Exception as e:
-            logger.error(f"Transaction simulation failed: {e}")
+            logger.error("Transaction simulation failed: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -701,12 +1297,21 @@ class AlgorandService:
         Returns:
             Balance in microAlgos
         """
+        balance = self._account_balances.get(address)
+        if balance is not None:
+            return balance
+        
         try:
-            account_info = self.algod_client.account_info(address)
-            return account_info.get("amount", 0)
+            if self.http is not None:
+                account_info = await self._algod_get(f"/v2/accounts/{address}")
+            else:
+                account_info = await self._algod_thread(self.algod_client.account_info, address)
+            balance = account_info.get("amount", 0)
+            self._account_balances[address] = balance
+            return balance
             
         except Exception as e:
-            logger.error(f"Check account balance failed: {e}")
+            logger.error("Check account balance failed: %s", e)
             return 0
     
     # ========================================================================
@@ -735,10 +1340,17 @@ class AlgorandService:
             if next_token:
                 params["next"] = next_token
             
-            response = self.indexer_client.search_transactions_by_address(
-                address=address,
-                **params
-            )
+            if self.http is not None:
+                response = await self._indexer_get(
+                    f"/v2/accounts/{address}/transactions",
+                    params
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self.indexer_client.search_transactions_by_address,
+                    address=address,
+                    **params
+                )
             
             return {
                 "transactions": response.get("transactions", []),
@@ -747,20 +1359,27 @@ class AlgorandService:
             }
             
         except Exception as e:
-            logger.error(f"Get account transactions failed: {e}")
+            logger.error("Get account transactions failed: %s", e)
             return {
                 "transactions": [],
                 "next_token": None
             }
 
 
-# Singleton instance
+# Singleton instance; the lock guards first construction, which may also
+# be reached from worker threads
 _algorand_service: Optional[AlgorandService] = None
+_algorand_service_lock = threading.Lock()
 
 
 def get_algorand_service() -> AlgorandService:
     """Get singleton Algorand service instance"""
     global _algorand_service
-    if _algorand_service is None:
-        _algorand_service = AlgorandService()
-    return _algorand_service
+    service = _algorand_service
+    if service is not None:
+        return service
+    
+    with _algorand_service_lock:
+        if _algorand_service is None:
+            _algorand_service = AlgorandService()
+        return _algorand_service
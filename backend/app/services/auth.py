@@ -3,26 +3,227 @@ Authentication Service
 Handles wallet signature verification and JWT generation
 """
 
+import asyncio
+import functools
+import hashlib
+import hmac
+import logging
+import os
 import secrets
-import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Tuple, Optional
+from typing import Any, Dict, List, Tuple, Optional
 
-from jose import jwt
-from algosdk import encoding
+import jwt
+import orjson
+import pybase64
+from cachetools import TTLCache
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 from algosdk.error import WrongChecksumError
-import nacl.signing
-import nacl.encoding
 
 from app.config import settings
+from app.utils.address import decode_address
+
+logger = logging.getLogger(__name__)
+
+
+def load_jwt_keys(secret: str, algorithm: str) -> Tuple[Any, Any]:
+    """
+    Parse the configured JWT secret into (signing_key, verify_key)
+    
+    HS* algorithms use the raw secret bytes for both. For RS*/ES*/PS*/EdDSA
+    the secret is a PEM private key; its public half is used for verification.
+    Parsing once at import avoids re-reading the PEM on every encode/decode.
+    """
+    if algorithm.startswith("HS"):
+        key = secret.encode("utf-8")
+        return key, key
+    
+    private_key = serialization.load_pem_private_key(
+        secret.encode("utf-8"),
+        password=None
+    )
+    return private_key, private_key.public_key()
+
+
+JWT_SIGNING_KEY, JWT_VERIFY_KEY = load_jwt_keys(
+    settings.JWT_SECRET_KEY,
+    settings.JWT_ALGORITHM
+)
+
+
+# JWS encoder for asymmetric algorithms; takes a pre-serialized payload
+_JWS = jwt.PyJWS()
+
+# Digests for the HMAC JWT algorithms, which are signed without PyJWT
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512
+}
+
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used for JWT segments"""
+    return pybase64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Constant parts of the login challenge message
+_CHALLENGE_PREFIX = b"AlgoCampus Login\nAddress: "
+_CHALLENGE_NONCE = b"\nNonce: "
+_CHALLENGE_TIMESTAMP = b"\nTimestamp: "
+
+# Lifetime and capacity of pending login challenges
+CHALLENGE_TTL_SECONDS = 300
+CHALLENGE_MAX_PENDING = 100_000
+
+# Signature checks get their own small pool so logins never queue behind
+# blocking algod calls on the default executor
+_VERIFY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="sigverify"
+)
+
+# Most verification-failure warnings logged per second; a probe sending bad
+# signatures shouldn't turn into a log flood
+VERIFY_FAILURE_LOG_RATE = 100
+
+# Seconds to collect concurrent login signatures into one verification batch
+VERIFY_BATCH_WINDOW = 0.002
+
+
+class _LogRateLimiter:
+    """Token bucket deciding whether a log line may be emitted"""
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+    
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+_verify_log_limiter = _LogRateLimiter(VERIFY_FAILURE_LOG_RATE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _verify_key(wallet_address: str) -> Ed25519PublicKey:
+    """
+    Ed25519 verify key for an address, memoized for repeat logins
+    
+    Algorand addresses are base32 encoded public keys with checksum;
+    decoding and key construction happen once per address.
+    """
+    return Ed25519PublicKey.from_public_bytes(decode_address(wallet_address))
+
+
+def _verify_one(verify_key: Ed25519PublicKey, message: bytes, signature: bytes) -> bool:
+    """Check one Ed25519 signature"""
+    try:
+        verify_key.verify(signature, message)
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+def _verify_many(items: List[Tuple[Ed25519PublicKey, bytes, bytes]]) -> List[bool]:
+    """Verify (verify_key, message, signature) triples; runs in a worker thread"""
+    return [_verify_one(*item) for item in items]
+
+
+class _SignatureBatcher:
+    """
+    Coalesce signature checks arriving within a short window.
+    
+    A check with no other login in the last window is verified inline: one
+    Ed25519 verify is far cheaper than a sleep plus a thread hop. Under
+    concurrency the first queued check schedules a flush; everything queued
+    by then is verified in a single call on the verification pool, so a
+    login burst costs one thread hop instead of one per request and never
+    blocks the loop.
+    """
+    
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: List[Tuple[Tuple[Ed25519PublicKey, bytes, bytes], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_check = float("-inf")
+    
+    async def verify(
+        self,
+        verify_key: Ed25519PublicKey,
+        message: bytes,
+        signature: bytes
+    ) -> bool:
+        now = time.monotonic()
+        busy = self._flush_task is not None or now - self._last_check < self.window
+        self._last_check = now
+        if not busy:
+            return _verify_one(verify_key, message, signature)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((verify_key, message, signature), future))
+        
+        # Flush runs as its own task so a cancelled request can't strand the batch
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        
+        return await future
+    
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.window)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+        
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                _VERIFY_EXECUTOR, _verify_many, [item for item, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), is_valid in zip(batch, results):
+            if not future.done():
+                future.set_result(is_valid)
 
 
 class AuthService:
     """Service for wallet-based authentication"""
     
     def __init__(self):
-        self.challenges = {}  # In-memory storage for development
+        # In-memory storage for development; expired challenges are evicted
+        # by the cache, so abandoned logins can't grow it without bound.
         # In production, use Redis: self.redis = redis.Redis(...)
+        self.challenges: TTLCache = TTLCache(
+            maxsize=CHALLENGE_MAX_PENDING,
+            ttl=CHALLENGE_TTL_SECONDS
+        )
+        
+        # Token settings are fixed for the process lifetime
+        self._header = {"alg": settings.JWT_ALGORITHM, "typ": "JWT"}
+        self._header_b64 = _b64url(orjson.dumps(self._header))
+        self._hmac_digest = _HMAC_DIGESTS.get(settings.JWT_ALGORITHM)
+        self._exp_seconds = int(
+            timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES).total_seconds()
+        )
+        self._refresh_exp_seconds = int(
+            timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS).total_seconds()
+        )
+        
+        self._signature_batcher = _SignatureBatcher(VERIFY_BATCH_WINDOW)
         
     async def generate_challenge(
         self, 
@@ -37,19 +238,33 @@ class AuthService:
         Returns:
             Tuple of (nonce, message, expiration_time)
         """
-        # Generate random nonce
-        nonce = secrets.token_hex(32)
+        # Generate random nonce: 192 bits as 32 base64url chars (24 bytes
+        # encode without padding)
+        nonce_bytes = pybase64.urlsafe_b64encode(secrets.token_bytes(24))
+        nonce = nonce_bytes.decode("ascii")
         
-        # Create message to sign
-        message = f"AlgoCampus Login\nAddress: {wallet_address}\nNonce: {nonce}\nTimestamp: {datetime.utcnow().isoformat()}"
+        now = datetime.utcnow()
+        
+        # Create message to sign; assembled as bytes from the constant parts,
+        # since that is what gets verified (all parts are ASCII)
+        message_bytes = b"".join((
+            _CHALLENGE_PREFIX,
+            wallet_address.encode("ascii"),
+            _CHALLENGE_NONCE,
+            nonce_bytes,
+            _CHALLENGE_TIMESTAMP,
+            now.isoformat().encode("ascii")
+        ))
+        message = message_bytes.decode("ascii")
         
         # Set expiration (5 minutes)
-        expires_at = datetime.utcnow() + timedelta(minutes=5)
+        expires_at = now + timedelta(seconds=CHALLENGE_TTL_SECONDS)
         
         # Store challenge (use Redis in production)
         self.challenges[wallet_address] = {
             "nonce": nonce,
             "message": message,
+            "message_bytes": message_bytes,
             "expires_at": expires_at
         }
         
@@ -72,7 +287,7 @@ class AuthService:
         Returns:
             True if signature is valid
         """
-        # Check if challenge exists
+        # Check if challenge exists (expired ones are already evicted)
         challenge = self.challenges.get(wallet_address)
         if not challenge:
             return False
@@ -81,36 +296,61 @@ class AuthService:
         if challenge["nonce"] != nonce:
             return False
             
-        # Check not expired
-        if datetime.utcnow() > challenge["expires_at"]:
-            del self.challenges[wallet_address]
-            return False
-            
         # Verify signature
         try:
             # Decode signature
-            sig_bytes = base64.b64decode(signature)
+            sig_bytes = pybase64.b64decode(signature, validate=True)
             
             # Get message bytes
-            message_bytes = challenge["message"].encode('utf-8')
-            
-            # Decode address to get public key
-            # Algorand addresses are base32 encoded public keys with checksum
-            public_key = encoding.decode_address(wallet_address)
-            
-            # Verify using NaCl (Ed25519)
-            verify_key = nacl.signing.VerifyKey(public_key)
-            verify_key.verify(message_bytes, sig_bytes)
+            message_bytes = challenge["message_bytes"]
             
-            # Signature valid, delete challenge
-            del self.challenges[wallet_address]
-            
-            return True
-            
-        except Exception as e:
-            print(f"Signature verification failed: {e}")
+            # Public key from the address (cached per wallet)
+            verify_key = _verify_key(wallet_address)
+        except (ValueError, WrongChecksumError) as e:
+            # Malformed signature or address
+            if _verify_log_limiter.allow():
+                logger.warning(
+                    "Signature verification failed: %s", e,
+                    extra={"wallet_address": wallet_address}
+                )
+            return False
+        
+        # Verify Ed25519 via OpenSSL, batched with concurrent logins
+        if not await self._signature_batcher.verify(verify_key, message_bytes, sig_bytes):
+            if _verify_log_limiter.allow():
+                logger.warning(
+                    "Signature verification failed: invalid signature",
+                    extra={"wallet_address": wallet_address}
+                )
             return False
+        
+        # Signature valid, delete challenge (it may have expired meanwhile)
+        self.challenges.pop(wallet_address, None)
+        
+        return True
             
+    def _encode_token(self, payload: Dict[str, Any]) -> str:
+        """
+        Encode and sign a JWT
+        
+        The payload is serialized with orjson in both paths. HS* tokens are
+        assembled here from the pre-encoded header and an HMAC over the
+        signing input; other algorithms sign the bytes through PyJWT's JWS layer.
+        """
+        payload_json = orjson.dumps(payload)
+        
+        if self._hmac_digest is None:
+            return _JWS.encode(
+                payload_json,
+                JWT_SIGNING_KEY,
+                algorithm=settings.JWT_ALGORITHM,
+                headers=self._header
+            )
+        
+        signing_input = self._header_b64 + b"." + _b64url(payload_json)
+        signature = hmac.new(JWT_SIGNING_KEY, signing_input, self._hmac_digest).digest()
+        return (signing_input + b"." + _b64url(signature)).decode("ascii")
+        
     def create_access_token(self, wallet_address: str) -> str:
         """
         Create JWT access token
@@ -121,23 +361,14 @@ class AuthService:
         Returns:
             JWT access token
         """
-        expires_delta = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-        expire = datetime.utcnow() + expires_delta
+        now = int(time.time())
         
-        to_encode = {
+        return self._encode_token({
             "sub": wallet_address,
-            "exp": expire,
-            "iat": datetime.utcnow(),
+            "exp": now + self._exp_seconds,
+            "iat": now,
             "type": "access"
-        }
-        
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
-        
-        return encoded_jwt
+        })
         
     def create_refresh_token(self, wallet_address: str) -> str:
         """
@@ -149,20 +380,23 @@ class AuthService:
         Returns:
             JWT refresh token
         """
-        expires_delta = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
-        expire = datetime.utcnow() + expires_delta
+        now = int(time.time())
         
-        to_encode = {
+        return self._encode_token({
             "sub": wallet_address,
-            "exp": expire,
-            "iat": datetime.utcnow(),
+            "exp": now + self._refresh_exp_seconds,
+            "iat": now,
             "type": "refresh"
-        }
-        
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
-        
-        return encoded_jwt
+        })
+
+
+# Singleton instance (pending challenges live in memory on the service)
+_auth_service: Optional[AuthService] = None
+
+
+def get_auth_service() -> AuthService:
+    """Get singleton auth service instance"""
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+    return _auth_service
@@ -2,15 +2,16 @@
 Expense Service - Business logic for expense management
 """
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, insert, update, and_, exists, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.database import Expense, ExpenseSplit, Transaction, Group, User
+from app.models.database import Expense, ExpenseSplit, Transaction, Group, GroupMember, User
 from app.services.algorand_service import get_algorand_service, TransactionResult
 from app.utils.errors import (
     ValidationError,
@@ -59,13 +60,12 @@ class ExpenseService:
             SmartContractError: If on-chain transaction fails
         """
         try:
-            # Validate group exists
-            group = await self._get_group(group_id)
+            # Validate group exists and payer is a member (one round-trip)
+            group, is_member = await self._get_group_membership(group_id, payer_address)
             if not group:
                 raise ResourceNotFoundError(f"Group {group_id} not found")
             
-            # Validate payer is a member
-            if not await self._is_member(group_id, payer_address):
+            if not is_member:
                 raise AuthorizationError(
                     f"Address {payer_address} is not a member of group {group_id}"
                 )
@@ -82,8 +82,7 @@ class ExpenseService:
             
             # Add expense on-chain (only if private key is provided)
             chain_expense_id = None
-            tx_id = None
-            confirmed_round = None
+            chain_task = None
             
             if payer_private_key:
                 logger.info(
@@ -91,19 +90,68 @@ class ExpenseService:
                     f"amount={amount}, split_with={len(split_with)} members"
                 )
                 
-                tx_result = await self.algo_service.add_expense(
+                # Submitted in the background; the expense and split rows are
+                # written while algod confirms. The task never touches the session.
+                chain_task = asyncio.create_task(self.algo_service.add_expense(
                     payer_address=payer_address,
                     payer_private_key=payer_private_key,
                     group_id=group.chain_group_id,
                     amount=amount,
                     note=description,
                     split_with=split_with
+                ))
+            else:
+                logger.info(
+                    f"Adding expense off-chain (no private key): "
+                    f"group_id={group.chain_group_id}, amount={amount}"
+                )
+                # Auto-increment chain_expense_id for off-chain expenses
+                max_id_result = await self.db.execute(
+                    select(func.coalesce(func.max(Expense.chain_expense_id), 0))
+                )
+                chain_expense_id = max_id_result.scalar() + 1
+            
+            try:
+                # Create expense record
+                expense = Expense(
+                    chain_expense_id=chain_expense_id,
+                    group_id=group_id,
+                    amount=amount,
+                    description=description,
+                    payer_address=payer_address,
+                    split_type=split_type.value if hasattr(split_type, 'value') else str(split_type),
+                    settled=False
                 )
+                self.db.add(expense)
+                await self.db.flush()
+                
+                # Calculate and create splits
+                split_amount = amount // len(split_with)
+                remainder = amount % len(split_with)
+                
+                # One bulk INSERT for all splits; remainder goes to the first person (payer)
+                await self.db.execute(
+                    insert(ExpenseSplit),
+                    [
+                        {
+                            "expense_id": expense.id,
+                            "wallet_address": member_address,
+                            "amount": split_amount + (remainder if idx == 0 else 0),
+                            "settled": False
+                        }
+                        for idx, member_address in enumerate(split_with)
+                    ]
+                )
+            except BaseException:
+                if chain_task is not None:
+                    chain_task.cancel()
+                raise
+            
+            if chain_task is not None:
+                tx_result = await chain_task
                 
                 # Extract expense_id from logs
                 chain_expense_id = tx_result.decode_log(0)
-                tx_id = tx_result.tx_id
-                confirmed_round = tx_result.confirmed_round
                 
                 if not chain_expense_id:
                     raise SmartContractError("Failed to extract expense_id from transaction")
@@ -112,25 +160,13 @@ class ExpenseService:
                     f"Expense added on-chain: expense_id={chain_expense_id}, "
                     f"tx_id={tx_result.tx_id}"
                 )
-            else:
-                logger.info(
-                    f"Adding expense off-chain (no private key): "
-                    f"group_id={group.chain_group_id}, amount={amount}"
-                )
-                # Auto-increment chain_expense_id for off-chain expenses
-                max_id_result = await self.db.execute(
-                    select(func.coalesce(func.max(Expense.chain_expense_id), 0))
-                )
-                chain_expense_id = max_id_result.scalar() + 1
-            
-            # Create transaction record (if on-chain)
-            transaction_record_id = None
-            if tx_id:
+                
+                # Create transaction record
                 transaction = Transaction(
-                    transaction_id=tx_id,
-                    block_number=confirmed_round,
+                    transaction_id=tx_result.tx_id,
+                    block_number=tx_result.confirmed_round,
                     transaction_type="add_expense",
-                    metadata={
+                    tx_metadata={
                         "expense_id": chain_expense_id,
                         "group_id": group.chain_group_id,
                         "amount": amount,
@@ -139,37 +175,9 @@ class ExpenseService:
                 )
                 self.db.add(transaction)
                 await self.db.flush()
-                transaction_record_id = transaction.id
-            
-            # Create expense record
-            expense = Expense(
-                chain_expense_id=chain_expense_id,
-                group_id=group_id,
-                amount=amount,
-                description=description,
-                payer_address=payer_address,
-                split_type=split_type.value if hasattr(split_type, 'value') else str(split_type),
-                settled=False,
-                transaction_id=transaction_record_id
-            )
-            self.db.add(expense)
-            await self.db.flush()
-            
-            # Calculate and create splits
-            split_amount = amount // len(split_with)
-            remainder = amount % len(split_with)
-            
-            for idx, member_address in enumerate(split_with):
-                # Give remainder to first person (payer)
-                member_split = split_amount + (remainder if idx == 0 else 0)
                 
-                split = ExpenseSplit(
-                    expense_id=expense.id,
-                    wallet_address=member_address,
-                    amount=member_split,
-                    settled=False
-                )
-                self.db.add(split)
+                expense.chain_expense_id = chain_expense_id
+                expense.transaction_id = transaction.id
             
             await self.db.commit()
             await self.db.refresh(expense)
@@ -202,9 +210,9 @@ class ExpenseService:
         include_settled: bool = True,
         limit: int = 50,
         offset: int = 0
-    ) -> List[Expense]:
+    ) -> Tuple[List[Expense], int]:
         """
-        Get all expenses for a group.
+        Get a page of expenses for a group.
         
         Args:
             group_id: Database group ID
@@ -213,15 +221,17 @@ class ExpenseService:
             offset: Pagination offset
         
         Returns:
-            List of Expense models
+            Tuple of (page of Expense models, total matching expenses)
         """
         conditions = [Expense.group_id == group_id]
         
         if not include_settled:
-            conditions.append(Expense.settled is False)
+            conditions.append(Expense.settled.is_(False))
         
+        # The window count is computed over the full filtered set before
+        # LIMIT/OFFSET, so the total comes back with the page rows
         stmt = (
-            select(Expense)
+            select(Expense, func.count().over().label("total_count"))
             .where(and_(*conditions))
             .options(selectinload(Expense.splits))
             .order_by(Expense.created_at.desc())
@@ -230,7 +240,19 @@ class ExpenseService:
         )
         
         result = await self.db.execute(stmt)
-        return list(result.scalars().all())
+        rows = result.all()
+        
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        
+        if offset == 0:
+            return [], 0
+        
+        # Page past the end: no row carried the window count
+        count_result = await self.db.execute(
+            select(func.count()).select_from(Expense).where(and_(*conditions))
+        )
+        return [], count_result.scalar_one()
     
     async def get_user_expenses(
         self,
@@ -318,18 +340,26 @@ class ExpenseService:
         Returns:
             Updated Expense model
         """
-        expense = await self.get_expense(expense_id)
+        # Two set-based UPDATEs; the split rows are never loaded
+        result = await self.db.execute(
+            update(Expense)
+            .where(Expense.id == expense_id)
+            .values(settled=True)
+            .returning(Expense)
+        )
+        expense = result.scalar_one_or_none()
         if not expense:
+            await self.db.rollback()
             raise ResourceNotFoundError(f"Expense {expense_id} not found")
         
-        expense.settled = True
-        
         # Mark all splits as settled
-        for split in expense.splits:
-            split.settled = True
+        await self.db.execute(
+            update(ExpenseSplit)
+            .where(ExpenseSplit.expense_id == expense_id)
+            .values(settled=True)
+        )
         
         await self.db.commit()
-        await self.db.refresh(expense)
         
         logger.info(f"Expense {expense_id} marked as settled by {settled_by_address}")
         
@@ -344,15 +374,21 @@ class ExpenseService:
         )
         return result.scalar_one_or_none()
     
-    async def _is_member(self, group_id: int, wallet_address: str) -> bool:
-        """Check if user is a member of the group"""
-        from app.models.database import GroupMember
+    async def _get_group_membership(
+        self,
+        group_id: int,
+        wallet_address: str
+    ) -> Tuple[Optional[Group], bool]:
+        """Get group by ID together with whether the user is a member of it"""
+        is_member = exists().where(
+            GroupMember.group_id == Group.id,
+            GroupMember.wallet_address == wallet_address
+        )
         
-        stmt = select(GroupMember).where(
-            and_(
-                GroupMember.group_id == group_id,
-                GroupMember.wallet_address == wallet_address
-            )
+        result = await self.db.execute(
+            select(Group, is_member.label("is_member")).where(Group.id == group_id)
         )
-        result = await self.db.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        row = result.one_or_none()
+        if row is None:
+            return None, False
+        return row[0], row[1]
@@ -3,14 +3,13 @@ Group Management Service
 Business logic for group operations
 """
 
-from typing import Optional
-from sqlalchemy import select, and_, func
+from typing import List, Optional
+from sqlalchemy import select, insert, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from algosdk.v2client import algod
-from algosdk import transaction, account, encoding
+from sqlalchemy.orm import joinedload
 
-from app.config import settings
 from app.models import database as db_models
+from app.services.algorand_service import get_algorand_service
 
 
 class GroupService:
@@ -18,12 +17,8 @@ class GroupService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        
-        # Initialize Algorand client
-        self.algod_client = algod.AlgodClient(
-            settings.ALGORAND_ALGOD_TOKEN,
-            settings.ALGORAND_ALGOD_URL
-        )
+        # Shared service: one algod client and suggested-params cache per process
+        self.algo_service = get_algorand_service()
         
     async def create_group(
         self,
@@ -43,40 +38,36 @@ class GroupService:
         # For now, using auto-incremented chain_group_id
         # In production, this would call GroupManager.create_group()
         
-        max_id_result = await self.db.execute(
-            select(func.coalesce(func.max(db_models.Group.chain_group_id), 0))
-        )
-        chain_group_id = max_id_result.scalar() + 1
-        
-        # Create database record
+        # Create database record with the creator as admin member and a zero
+        # balance; the unit of work writes all three in one flush
         group = db_models.Group(
-            chain_group_id=chain_group_id,
             name=name,
             description=description,
             admin_address=admin_address,
-            active=True
+            active=True,
+            members=[
+                db_models.GroupMember(
+                    wallet_address=admin_address,
+                    role="admin"
+                )
+            ],
+            balances=[
+                db_models.Balance(
+                    wallet_address=admin_address,
+                    balance=0
+                )
+            ]
         )
         
-        self.db.add(group)
-        await self.db.flush()  # Get group.id
-        
-        # Add creator as admin member
-        member = db_models.GroupMember(
-            group_id=group.id,
-            wallet_address=admin_address,
-            role="admin"
-        )
-        
-        self.db.add(member)
-        
-        # Initialize balance for creator
-        balance = db_models.Balance(
-            group_id=group.id,
-            wallet_address=admin_address,
-            balance=0
-        )
+        # Postgres draws chain_group_id from its sequence inside the INSERT;
+        # backends without sequences (SQLite) fall back to max + 1
+        if not self.db.bind.dialect.supports_sequences:
+            max_id_result = await self.db.execute(
+                select(func.coalesce(func.max(db_models.Group.chain_group_id), 0))
+            )
+            group.chain_group_id = max_id_result.scalar() + 1
         
-        self.db.add(balance)
+        self.db.add(group)
         
         await self.db.commit()
         await self.db.refresh(group)
@@ -87,7 +78,8 @@ class GroupService:
         self,
         group_id: int,
         member_address: str,
-        admin_address: str
+        admin_address: str,
+        admin_private_key: Optional[str] = None
     ) -> None:
         """
         Add a member to a group
@@ -96,10 +88,30 @@ class GroupService:
         - admin_address must be group admin
         - member_address not already in group
         """
-        # Get group
-        group_query = select(db_models.Group).where(db_models.Group.id == group_id)
-        group_result = await self.db.execute(group_query)
-        group = group_result.scalar_one_or_none()
+        await self.add_members_bulk(
+            group_id, [member_address], admin_address, admin_private_key
+        )
+        
+    async def add_members_bulk(
+        self,
+        group_id: int,
+        member_addresses: List[str],
+        admin_address: str,
+        admin_private_key: Optional[str] = None
+    ) -> None:
+        """
+        Add several members to a group
+        
+        Admin permission is checked once and memberships and balances are
+        written as one bulk INSERT each, in a single commit. With the
+        admin's private key the members are also added on-chain, submitted
+        as atomic groups of up to 16 so a whole batch confirms together.
+        
+        Requires:
+        - admin_address must be group admin
+        - no member_address already in group
+        """
+        group = await self._get_group_with_members(group_id)
         
         if not group:
             raise ValueError("Group not found")
@@ -109,36 +121,43 @@ class GroupService:
             raise PermissionError("Only group admin can add members")
             
         # Check if already a member
-        member_query = select(db_models.GroupMember).where(
-            and_(
-                db_models.GroupMember.group_id == group_id,
-                db_models.GroupMember.wallet_address == member_address
-            )
-        )
-        existing_result = await self.db.execute(member_query)
-        if existing_result.scalar_one_or_none():
+        existing = {m.wallet_address for m in group.members}
+        if any(address in existing for address in member_addresses):
             raise ValueError("Already a member")
             
-        # TODO: Call smart contract GroupManager.add_member()
+        # Dedupe, preserving order
+        member_addresses = list(dict.fromkeys(member_addresses))
+        if not member_addresses:
+            return
+        
+        # On-chain first (only if private key provided); a failed submit
+        # leaves the database untouched
+        if admin_private_key:
+            await self.algo_service.add_group_members_batch(
+                admin_address=admin_address,
+                admin_private_key=admin_private_key,
+                group_id=group.chain_group_id,
+                members=member_addresses
+            )
         
         # Add to database
-        member = db_models.GroupMember(
-            group_id=group_id,
-            wallet_address=member_address,
-            role="member"
+        await self.db.execute(
+            insert(db_models.GroupMember),
+            [
+                {"group_id": group_id, "wallet_address": address, "role": "member"}
+                for address in member_addresses
+            ]
         )
         
-        self.db.add(member)
-        
-        # Initialize balance
-        balance = db_models.Balance(
-            group_id=group_id,
-            wallet_address=member_address,
-            balance=0
+        # Initialize balances
+        await self.db.execute(
+            insert(db_models.Balance),
+            [
+                {"group_id": group_id, "wallet_address": address, "balance": 0}
+                for address in member_addresses
+            ]
         )
         
-        self.db.add(balance)
-        
         await self.db.commit()
         
     async def remove_member(
@@ -154,10 +173,7 @@ class GroupService:
         - admin_address must be group admin
         - member_address cannot be admin
         """
-        # Get group
-        group_query = select(db_models.Group).where(db_models.Group.id == group_id)
-        group_result = await self.db.execute(group_query)
-        group = group_result.scalar_one_or_none()
+        group = await self._get_group_with_members(group_id)
         
         if not group:
             raise ValueError("Group not found")
@@ -171,14 +187,10 @@ class GroupService:
             raise ValueError("Cannot remove group admin")
             
         # Get member
-        member_query = select(db_models.GroupMember).where(
-            and_(
-                db_models.GroupMember.group_id == group_id,
-                db_models.GroupMember.wallet_address == member_address
-            )
+        member = next(
+            (m for m in group.members if m.wallet_address == member_address),
+            None
         )
-        member_result = await self.db.execute(member_query)
-        member = member_result.scalar_one_or_none()
         
         if not member:
             raise ValueError("Not a member")
@@ -205,3 +217,14 @@ class GroupService:
             balance.wallet_address: balance.balance
             for balance in balances
         }
+        
+    async def _get_group_with_members(
+        self,
+        group_id: int
+    ) -> Optional[db_models.Group]:
+        """Get group with its members eagerly joined in the same SELECT"""
+        group_query = select(db_models.Group).options(
+            joinedload(db_models.Group.members)
+        ).where(db_models.Group.id == group_id)
+        group_result = await self.db.execute(group_query)
+        return group_result.unique().scalar_one_or_none()
@@ -2,15 +2,18 @@
 Settlement Service - Business logic for debt settlements
 """
 
+import asyncio
+import contextlib
+import heapq
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
-from sqlalchemy import select, and_, or_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Executable, Select, select, insert, and_, or_, func, union_all
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
-from app.models.database import Settlement, Transaction, Group, Expense
+from app.models.database import Settlement, Transaction, Group, Expense, ExpenseSplit
 from app.services.algorand_service import get_algorand_service
 from app.utils.errors import (
     ValidationError,
@@ -22,6 +25,196 @@ from app.utils.errors import (
 
 logger = logging.getLogger(__name__)
 
+# Seconds queued settlement writes wait for others to share their commit
+SETTLEMENT_WRITE_WINDOW = 0.05
+
+# Queued write units that trigger a commit before the window ends
+SETTLEMENT_WRITE_MAX_BATCH = 100
+
+
+def _simplify_balances(balances: Dict[str, int]) -> List[Tuple[str, str, int]]:
+    """
+    Greedy debt simplification: repeatedly settle the largest debtor
+    against the largest creditor.
+    
+    Both sides live in max-heaps (negated amounts), so each step is
+    O(log N) instead of a linear max() scan over every member.
+    
+    Returns:
+        List of (from_address, to_address, amount) tuples
+    """
+    creditors = [(-bal, addr) for addr, bal in balances.items() if bal > 0]
+    debtors = [(bal, addr) for addr, bal in balances.items() if bal < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+    
+    settlements = []
+    
+    while creditors and debtors:
+        neg_credit, creditor = heapq.heappop(creditors)
+        neg_debt, debtor = heapq.heappop(debtors)
+        
+        # Settlement amount is minimum of the two
+        amount = min(-neg_credit, -neg_debt)
+        settlements.append((debtor, creditor, amount))
+        
+        # Push back whichever side is not yet settled
+        if neg_credit + amount:
+            heapq.heappush(creditors, (neg_credit + amount, creditor))
+        if neg_debt + amount:
+            heapq.heappush(debtors, (neg_debt + amount, debtor))
+    
+    return settlements
+
+
+class SettlementWriteBatcher:
+    """
+    Commit settlement inserts from concurrent requests together.
+    
+    Each submit() queues a unit of statements that must land atomically.
+    A background task waits up to SETTLEMENT_WRITE_WINDOW (or until
+    SETTLEMENT_WRITE_MAX_BATCH units are queued), then runs every queued
+    unit in one transaction, so a burst of settlements pays for one
+    COMMIT instead of one each. Readers call flush() first to see
+    writes that are still queued.
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        window: float = SETTLEMENT_WRITE_WINDOW,
+        max_batch: int = SETTLEMENT_WRITE_MAX_BATCH
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Tuple[Executable, ...], asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+        # Serializes commits, so flush() also waits out a batch already being written
+        self._write_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """
+        Stop the background task and commit anything still queued.
+        
+        A batch the task is already writing finishes first (flush()
+        waits on the write lock), so no submitter is left waiting.
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self.flush()
+    
+    async def submit(self, *statements: Executable) -> Any:
+        """
+        Queue statements to commit together; returns once they are committed.
+        
+        The result is the scalar returned by the last statement (e.g. an
+        INSERT ... RETURNING), or None if it returns no rows.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((statements, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+    
+    async def flush(self) -> None:
+        """Commit everything queued so far"""
+        async with self._write_lock:
+            batch, self._pending = self._pending, []
+            self._has_pending.clear()
+            self._full.clear()
+            if batch:
+                try:
+                    await self._write(batch)
+                except BaseException:
+                    # Interrupted mid-write: release the waiting requests
+                    for _, future in batch:
+                        if not future.done():
+                            future.cancel()
+                    raise
+    
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.window)
+            try:
+                # Shielded so stop() can't cancel a batch halfway through its commit
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                # _write settles every future itself; keep the loop alive
+                logger.error("Settlement write batch failed: %s", e)
+    
+    async def _write(self, batch: List[Tuple[Tuple[Executable, ...], asyncio.Future]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    results = [await self._execute(session, statements) for statements, _ in batch]
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad unit would otherwise fail its whole batch; redo
+                # each unit in its own transaction so only it reports the error
+                for item in batch:
+                    await self._write([item])
+                return
+            
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    @staticmethod
+    async def _execute(session: AsyncSession, statements: Tuple[Executable, ...]) -> Any:
+        result = None
+        for statement in statements:
+            result = await session.execute(statement)
+        # ORM-enabled INSERT ... RETURNING yields a ChunkedIteratorResult, which
+        # has no returns_rows; decide from the statement instead
+        if result is None or not getattr(statements[-1], "_returning", None):
+            return None
+        return result.scalars().first()
+
+
+# Process-wide batcher, present only while SETTLEMENT_WRITE_BATCHING is on
+_settlement_write_batcher: Optional[SettlementWriteBatcher] = None
+
+
+def start_settlement_write_batcher(session_factory: async_sessionmaker) -> SettlementWriteBatcher:
+    """Create and start the process-wide settlement write batcher"""
+    global _settlement_write_batcher
+    if _settlement_write_batcher is None:
+        _settlement_write_batcher = SettlementWriteBatcher(session_factory)
+        _settlement_write_batcher.start()
+    return _settlement_write_batcher
+
+
+async def stop_settlement_write_batcher() -> None:
+    """Stop the settlement write batcher, committing queued writes"""
+    global _settlement_write_batcher
+    batcher, _settlement_write_batcher = _settlement_write_batcher, None
+    if batcher is not None:
+        await batcher.stop()
+
+
+def get_settlement_write_batcher() -> Optional[SettlementWriteBatcher]:
+    """The running settlement write batcher, or None when batching is off"""
+    return _settlement_write_batcher
+
 
 class SettlementService:
     """Service for managing settlements"""
@@ -121,14 +314,13 @@ class SettlementService:
                     f"debtor={debtor_address}, creditor={creditor_address}, amount={amount}"
                 )
             
-            # Create transaction record (if on-chain)
-            transaction_record_id = None
+            transaction_values = None
             if tx_id:
-                transaction = Transaction(
-                    transaction_id=tx_id,
-                    block_number=confirmed_round,
-                    transaction_type="initiate_settlement",
-                    metadata={
+                transaction_values = {
+                    "transaction_id": tx_id,
+                    "block_number": confirmed_round,
+                    "transaction_type": "initiate_settlement",
+                    "tx_metadata": {
                         "settlement_id": chain_settlement_id,
                         "debtor": debtor_address,
                         "creditor": creditor_address,
@@ -136,25 +328,36 @@ class SettlementService:
                         "expense_id": chain_expense_id,
                         "group_id": chain_group_id
                     }
-                )
-                self.db.add(transaction)
-                await self.db.flush()
-                transaction_record_id = transaction.id
-            
-            # Create settlement record
-            settlement = Settlement(
-                chain_settlement_id=chain_settlement_id,
-                from_address=debtor_address,
-                to_address=creditor_address,
-                amount=amount,
-                status="pending",
-                group_id=group_id,
-                transaction_id=transaction_record_id
-            )
-            self.db.add(settlement)
+                }
             
-            await self.db.commit()
-            await self.db.refresh(settlement)
+            settlement_values = {
+                "chain_settlement_id": chain_settlement_id,
+                "expense_id": expense_id,
+                "from_address": debtor_address,
+                "to_address": creditor_address,
+                "amount": amount,
+                "status": "pending",
+                "transaction_id": tx_id
+            }
+            
+            batcher = get_settlement_write_batcher()
+            if batcher is not None:
+                # Both rows share a commit with concurrent settlements
+                statements = [insert(Settlement).values(**settlement_values).returning(Settlement)]
+                if transaction_values:
+                    statements.insert(0, insert(Transaction).values(**transaction_values))
+                settlement = await batcher.submit(*statements)
+            else:
+                # Settlement.transaction_id holds the Algorand txn ID rather than
+                # the log row's key, so both rows go into a single flush at commit
+                if transaction_values:
+                    self.db.add(Transaction(**transaction_values))
+                
+                # Create settlement record
+                settlement = Settlement(**settlement_values)
+                self.db.add(settlement)
+                
+                await self.db.commit()
             
             logger.info(f"Settlement {settlement.id} created successfully in database")
             
@@ -238,28 +441,26 @@ class SettlementService:
                 f"settlement_id={settlement.chain_settlement_id}, tx_id={tx_result.tx_id}"
             )
             
-            # Create transaction record
-            transaction = Transaction(
+            # Log the execution and complete the settlement in one commit;
+            # nothing needs the log row's key, so there is no separate flush
+            self.db.add(Transaction(
                 transaction_id=tx_result.tx_id,
                 block_number=tx_result.confirmed_round,
                 transaction_type="execute_settlement",
-                metadata={
+                tx_metadata={
                     "settlement_id": settlement.chain_settlement_id,
                     "amount": settlement.amount,
                     "debtor": settlement.from_address,
                     "creditor": settlement.to_address
                 }
-            )
-            self.db.add(transaction)
-            await self.db.flush()
+            ))
             
             # Update settlement status
             settlement.status = "completed"
-            settlement.executed_at = datetime.utcnow()
-            settlement.execution_transaction_id = transaction.id
+            settlement.completed_at = datetime.utcnow()
+            settlement.transaction_id = tx_result.tx_id
             
             await self.db.commit()
-            await self.db.refresh(settlement)
             
             logger.info(f"Settlement {settlement.id} marked as completed")
             
@@ -295,6 +496,9 @@ class SettlementService:
         Args:
             settlement_id: Database settlement ID
         
+        Completed settlements are final on-chain, so the algod lookup
+        is skipped for them and the database row is returned as is.
+        
         Returns:
             Dict with status information
         """
@@ -302,10 +506,10 @@ class SettlementService:
         if not settlement:
             raise ResourceNotFoundError(f"Settlement {settlement_id} not found")
         
-        # Check on-chain status
-        chain_executed = await self.algo_service.get_settlement_status(
-            settlement.chain_settlement_id
-        )
+        if settlement.status == "completed":
+            chain_executed = True
+        else:
+            chain_executed = await self.get_settlement_onchain(settlement)
         
         return {
             "settlement_id": settlement.id,
@@ -317,9 +521,15 @@ class SettlementService:
             "status": settlement.status,
             "chain_executed": chain_executed,
             "created_at": settlement.created_at.isoformat(),
-            "executed_at": settlement.executed_at.isoformat() if settlement.executed_at else None
+            "executed_at": settlement.completed_at.isoformat() if settlement.completed_at else None
         }
     
+    async def get_settlement_onchain(self, settlement: Settlement) -> bool:
+        """Whether the settlement has been executed on-chain (algod round trip)"""
+        return await self.algo_service.get_settlement_status(
+            settlement.chain_settlement_id
+        )
+    
     async def get_user_settlements(
         self,
         wallet_address: str,
@@ -339,6 +549,53 @@ class SettlementService:
         Returns:
             List of Settlement models
         """
+        # Queued settlement writes must be visible to this read
+        batcher = get_settlement_write_batcher()
+        if batcher is not None:
+            await batcher.flush()
+        
+        stmt = self._user_settlements_stmt(wallet_address, group_id, status).limit(limit)
+        
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+    
+    async def stream_user_settlements(
+        self,
+        wallet_address: str,
+        group_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> AsyncIterator[Settlement]:
+        """
+        Stream every settlement involving a user, newest first.
+        
+        Rows are fetched from the driver in batches of 50 instead of
+        materializing the full result, so memory stays flat for bulk exports.
+        
+        Args:
+            wallet_address: User's wallet address
+            group_id: Optional group filter
+            status: Optional status filter (pending, completed, failed)
+        
+        Yields:
+            Settlement models
+        """
+        batcher = get_settlement_write_batcher()
+        if batcher is not None:
+            await batcher.flush()
+        
+        stmt = self._user_settlements_stmt(wallet_address, group_id, status)
+        
+        result = await self.db.stream_scalars(stmt.execution_options(yield_per=50))
+        async for settlement in result:
+            yield settlement
+    
+    def _user_settlements_stmt(
+        self,
+        wallet_address: str,
+        group_id: Optional[int],
+        status: Optional[str]
+    ) -> Select:
+        """Base query for settlements where the user is debtor or creditor"""
         conditions = [
             or_(
                 Settlement.from_address == wallet_address,
@@ -346,96 +603,110 @@ class SettlementService:
             )
         ]
         
-        if group_id:
-            conditions.append(Settlement.group_id == group_id)
-        
         if status:
             conditions.append(Settlement.status == status)
         
-        stmt = (
-            select(Settlement)
+        stmt = select(Settlement)
+        
+        if group_id:
+            # Settlements reach their group through the related expense;
+            # filter on the joined row instead of loading expenses per settlement
+            stmt = stmt.join(Settlement.expense)
+            conditions.append(Expense.group_id == group_id)
+        
+        return (
+            stmt
             .where(and_(*conditions))
             .order_by(Settlement.created_at.desc())
-            .limit(limit)
         )
-        
-        result = await self.db.execute(stmt)
-        return list(result.scalars().all())
     
     async def calculate_optimal_settlements(
         self,
         group_id: int
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Tuple[str, str, int]]:
         """
         Calculate optimal settlement plan to minimize transactions.
         
         Uses balance simplification algorithm:
-        1. Get all user balances
+        1. Net each member's unsettled splits (paid minus owed), less
+           completed settlements against the group's unsettled expenses
         2. Separate creditors (owed) and debtors (owe)
         3. Match largest creditor with largest debtor iteratively
         
+        Settlements only carry a group through their expense, so standalone
+        settlements (no expense_id) are not netted here.
+        
         Args:
             group_id: Database group ID
         
         Returns:
-            List of optimal settlement transactions
+            List of (from_address, to_address, amount) tuples, amount in microAlgos
         """
         try:
             group = await self._get_group(group_id)
             if not group:
                 raise ResourceNotFoundError(f"Group {group_id} not found")
             
-            # Get all members
-            from app.models.database import GroupMember
-            
-            stmt = select(GroupMember).where(GroupMember.group_id == group_id)
-            result = await self.db.execute(stmt)
-            members = result.scalars().all()
-            
-            # Get balances for all members
-            balances = {}
-            for member in members:
-                balance = await self.algo_service.get_user_balance(
-                    group_id=group.chain_group_id,
-                    user_address=member.wallet_address
+            # Net balance per member in one grouped query: the payer is
+            # credited each unsettled split, the split's member is debited
+            unsettled = and_(
+                Expense.group_id == group_id,
+                ExpenseSplit.settled.isnot(True)
+            )
+            owed = (
+                select(
+                    ExpenseSplit.wallet_address.label("wallet_address"),
+                    (-ExpenseSplit.amount).label("delta")
+                )
+                .join(Expense, ExpenseSplit.expense_id == Expense.id)
+                .where(unsettled)
+            )
+            paid = (
+                select(
+                    Expense.payer_address.label("wallet_address"),
+                    ExpenseSplit.amount.label("delta")
                 )
-                if balance != 0:
-                    balances[member.wallet_address] = balance
+                .join(Expense, ExpenseSplit.expense_id == Expense.id)
+                .where(unsettled)
+            )
             
-            # Separate creditors and debtors
-            creditors = {addr: bal for addr, bal in balances.items() if bal > 0}
-            debtors = {addr: -bal for addr, bal in balances.items() if bal < 0}
+            # A completed settlement moves the debtor up and the creditor down.
+            # Once its expense is marked settled the splits drop out above,
+            # so the settlement must drop out too
+            completed = and_(
+                Expense.group_id == group_id,
+                Expense.settled.isnot(True),
+                Settlement.status == "completed"
+            )
+            settled_from = (
+                select(
+                    Settlement.from_address.label("wallet_address"),
+                    Settlement.amount.label("delta")
+                )
+                .join(Expense, Settlement.expense_id == Expense.id)
+                .where(completed)
+            )
+            settled_to = (
+                select(
+                    Settlement.to_address.label("wallet_address"),
+                    (-Settlement.amount).label("delta")
+                )
+                .join(Expense, Settlement.expense_id == Expense.id)
+                .where(completed)
+            )
+            deltas = union_all(owed, paid, settled_from, settled_to).subquery()
             
-            # Calculate optimal settlements
-            settlements = []
+            result = await self.db.execute(
+                select(deltas.c.wallet_address, func.sum(deltas.c.delta))
+                .group_by(deltas.c.wallet_address)
+            )
+            balances = {
+                wallet_address: int(balance)
+                for wallet_address, balance in result.all()
+                if balance
+            }
             
-            while creditors and debtors:
-                # Get largest creditor and debtor
-                max_creditor = max(creditors, key=creditors.get)
-                max_debtor = max(debtors, key=debtors.get)
-                
-                max_credit = creditors[max_creditor]
-                max_debt = debtors[max_debtor]
-                
-                # Settlement amount is minimum of the two
-                settlement_amount = min(max_credit, max_debt)
-                
-                settlements.append({
-                    "from_address": max_debtor,
-                    "to_address": max_creditor,
-                    "amount": settlement_amount,
-                    "amount_algos": settlement_amount / 1_000_000
-                })
-                
-                # Update balances
-                creditors[max_creditor] -= settlement_amount
-                debtors[max_debtor] -= settlement_amount
-                
-                # Remove if settled
-                if creditors[max_creditor] == 0:
-                    del creditors[max_creditor]
-                if debtors[max_debtor] == 0:
-                    del debtors[max_debtor]
+            settlements = _simplify_balances(balances)
             
             logger.info(
                 f"Calculated {len(settlements)} optimal settlements for group {group_id}"
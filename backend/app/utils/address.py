@@ -0,0 +1,50 @@
+"""
+Algorand address decoding
+Table-driven replacement for algosdk's pure-Python base32 path
+"""
+
+import hashlib
+import re
+
+from algosdk import encoding
+from algosdk.error import WrongChecksumError
+
+# 58 base32 chars = 290 bits: 32-byte public key + 4-byte checksum + 2 pad bits
+_ADDRESS_RE = re.compile(r"[A-Z2-7]{58}")
+
+# RFC 4648 base32 alphabet -> the digit alphabet int(..., 32) understands,
+# so the whole address is decoded by a single C-level int() call
+_B32_TO_INT_DIGITS = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567",
+    "0123456789ABCDEFGHIJKLMNOPQRSTUV"
+)
+
+try:
+    hashlib.new("sha512_256")
+    _HAS_SHA512_256 = True
+except ValueError:
+    # OpenSSL build without SHA-512/256
+    _HAS_SHA512_256 = False
+
+
+def decode_address(address: str) -> bytes:
+    """
+    Decode an Algorand address to its 32-byte public key.
+    
+    Drop-in for algosdk.encoding.decode_address: raises ValueError for
+    malformed input and WrongChecksumError when the checksum doesn't match.
+    """
+    if not _HAS_SHA512_256:
+        return encoding.decode_address(address)
+    
+    if not isinstance(address, str) or not _ADDRESS_RE.fullmatch(address):
+        raise ValueError("Invalid Algorand address")
+    
+    raw = (int(address.translate(_B32_TO_INT_DIGITS), 32) >> 2).to_bytes(36, "big")
+    public_key = raw[:32]
+    
+    # Checksum is the last 4 bytes of SHA-512/256 over the public key
+    if hashlib.new("sha512_256", public_key).digest()[-4:] != raw[32:]:
+        raise WrongChecksumError()
+    
+    return public_key
@@ -0,0 +1,88 @@
+"""
+Response cache helpers
+Thin Redis get/set/delete wrappers that fail open when Redis is down
+"""
+
+import logging
+from typing import Iterable, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Settlement plans only change when an expense is recorded or settled, or
+# a settlement against one completes; those writes invalidate explicitly,
+# the TTL is a backstop
+PLAN_TTL_SECONDS = 300
+
+# Store a value only if the version key still holds the value the reader
+# saw before computing it; a concurrent invalidation bumps the version,
+# so a plan built from an older snapshot is never written back
+_SET_IF_VERSION = """
+if (redis.call('GET', KEYS[2]) or '') == ARGV[3] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def plan_cache_key(group_id: int) -> str:
+    """Cache key for a group's optimal settlement plan"""
+    return f"algocampus:plan:{group_id}"
+
+
+def plan_version_key(group_id: int) -> str:
+    """Counter bumped on every invalidation of a group's plan"""
+    return f"algocampus:plan:{group_id}:version"
+
+
+async def cache_get_versioned(
+    redis: Redis,
+    key: str,
+    version_key: str
+) -> Tuple[Optional[bytes], bytes]:
+    """
+    Return the cached value and the current version in one round trip.
+    
+    The version is passed back to cache_set_if_version once the value has
+    been recomputed. On a Redis error this reports a miss.
+    """
+    try:
+        value, version = await redis.mget(key, version_key)
+        return value, version or b""
+    except RedisError as e:
+        logger.warning(f"Cache read skipped, Redis unavailable: {e}")
+        return None, b""
+
+
+async def cache_set_if_version(
+    redis: Redis,
+    key: str,
+    value: bytes,
+    ttl: int,
+    version_key: str,
+    version: bytes
+) -> None:
+    """Store a value with a TTL unless the version moved since it was read"""
+    try:
+        await redis.eval(_SET_IF_VERSION, 2, key, version_key, value, ttl, version)
+    except RedisError as e:
+        logger.warning(f"Cache write skipped, Redis unavailable: {e}")
+
+
+async def invalidate_plans(redis: Redis, group_ids: Iterable[int]) -> None:
+    """Drop cached settlement plans for the given groups and bump their versions"""
+    group_ids = list(group_ids)
+    keys = [plan_cache_key(group_id) for group_id in group_ids]
+    if not keys:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            for group_id in group_ids:
+                pipe.incr(plan_version_key(group_id))
+            pipe.delete(*keys)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
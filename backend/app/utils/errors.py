@@ -27,6 +27,14 @@ class AlgorandTransactionError(BaseAppException):
         super().__init__(message, status_code=502, details=details)
 
 
+class TransactionRejectedError(AlgorandTransactionError):
+    """Raised when algod rejects a transaction (logic failure, overspend); resubmitting can't succeed"""
+
+
+class TransactionPendingError(AlgorandTransactionError):
+    """Raised when a submitted transaction's outcome can't be confirmed; resubmitting could duplicate it"""
+
+
 class SmartContractError(BaseAppException):
     """Raised when a smart contract interaction fails"""
     
@@ -4,8 +4,9 @@ Retry utilities with exponential backoff.
 
 import asyncio
 import logging
+import random
 from functools import wraps
-from typing import TypeVar, Callable, Any
+from typing import TypeVar, Callable, Any, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,9 @@ T = TypeVar('T')
 def retry_with_backoff(
     max_retries: int = 3,
     backoff: float = 1.0,
-    backoff_multiplier: float = 2.0
+    backoff_multiplier: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    no_retry: Tuple[Type[BaseException], ...] = ()
 ):
     """
     Decorator for retrying async functions with exponential backoff.
@@ -24,9 +27,14 @@ def retry_with_backoff(
         max_retries: Maximum number of retry attempts
         backoff: Initial backoff delay in seconds
         backoff_multiplier: Multiplier for exponential backoff
+        retry_on: Exception types that trigger a retry
+        no_retry: Exception types re-raised immediately, even if they match retry_on
+    
+    Each delay is jittered to 0.5x-1.5x of the nominal backoff so callers
+    failing together don't retry in lockstep.
     
     Example:
-        @retry_with_backoff(max_retries=3, backoff=1.0)
+        @retry_with_backoff(max_retries=3, backoff=1.0, no_retry=(ValidationError,))
         async def my_function():
             # Function code
             pass
@@ -34,29 +42,40 @@ def retry_with_backoff(
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # Fast path: the first attempt runs without any retry bookkeeping
+            try:
+                return await func(*args, **kwargs)
+            except no_retry:
+                raise
+            except retry_on as e:
+                if not max_retries:
+                    raise
+                last_exception = e
+            
             current_backoff = backoff
-            last_exception = None
             
-            for attempt in range(max_retries + 1):
+            for attempt in range(1, max_retries + 1):
+                delay = current_backoff * (0.5 + random.random())
+                logger.warning(
+                    "%s failed (attempt %d/%d): %s. Retrying in %.2fs...",
+                    func.__name__, attempt, max_retries, last_exception, delay
+                )
+                await asyncio.sleep(delay)
+                current_backoff *= backoff_multiplier
+                
                 try:
                     return await func(*args, **kwargs)
-                except Exception as e:
-                    last_exception = e
-                    
-                    if attempt < max_retries:
-                        logger.warning(
-                            f"{func.__name__} failed (attempt {attempt + 1}/{max_retries}): {e}. "
-                            f"Retrying in {current_backoff}s..."
-                        )
-                        await asyncio.sleep(current_backoff)
-                        current_backoff *= backoff_multiplier
-                    else:
+                except no_retry:
+                    raise
+                except retry_on as e:
+                    if attempt == max_retries:
                         logger.error(
-                            f"{func.__name__} failed after {max_retries} retries: {e}"
+                            "%s failed after %d retries: %s",
+                            func.__name__, max_retries, e
                         )
-            
-            # Raise the last exception if all retries failed
-            raise last_exception
+                        # Bare raise keeps the original traceback
+                        raise
+                    last_exception = e
         
         return wrapper
     return decorator
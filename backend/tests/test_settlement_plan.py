@@ -0,0 +1,100 @@
+"""
+Settlement plan netting against recorded settlements
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, Expense, ExpenseSplit, Group, Settlement
+from app.services.settlement import SettlementService
+
+PAYER = "A" * 58
+DEBTOR = "B" * 58
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def expense(db):
+    """PAYER paid 2 ALGO split equally with DEBTOR"""
+    group = Group(chain_group_id=1, name="Flat", admin_address=PAYER)
+    db.add(group)
+    await db.flush()
+    
+    expense = Expense(
+        chain_expense_id=1,
+        group_id=group.id,
+        amount=2_000_000,
+        payer_address=PAYER,
+        split_type="equal",
+        settled=False
+    )
+    expense.splits = [
+        ExpenseSplit(wallet_address=PAYER, amount=1_000_000, settled=False),
+        ExpenseSplit(wallet_address=DEBTOR, amount=1_000_000, settled=False)
+    ]
+    db.add(expense)
+    await db.commit()
+    return expense
+
+
+async def _record_settlement(db, expense, amount, status):
+    db.add(Settlement(
+        expense_id=expense.id,
+        from_address=DEBTOR,
+        to_address=PAYER,
+        amount=amount,
+        status=status
+    ))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_plan_from_unsettled_splits(db, expense):
+    plan = await SettlementService(db).calculate_optimal_settlements(expense.group_id)
+    
+    assert plan == [(DEBTOR, PAYER, 1_000_000)]
+
+
+@pytest.mark.asyncio
+async def test_completed_settlement_shrinks_plan(db, expense):
+    await _record_settlement(db, expense, 500_000, "completed")
+    
+    plan = await SettlementService(db).calculate_optimal_settlements(expense.group_id)
+    
+    assert plan == [(DEBTOR, PAYER, 500_000)]
+
+
+@pytest.mark.asyncio
+async def test_pending_settlement_leaves_plan(db, expense):
+    await _record_settlement(db, expense, 500_000, "pending")
+    
+    plan = await SettlementService(db).calculate_optimal_settlements(expense.group_id)
+    
+    assert plan == [(DEBTOR, PAYER, 1_000_000)]
+
+
+@pytest.mark.asyncio
+async def test_settled_expense_drops_its_settlements(db, expense):
+    await _record_settlement(db, expense, 1_000_000, "completed")
+    # As ExpenseService.mark_expense_settled does
+    expense.settled = True
+    for split in expense.splits:
+        split.settled = True
+    await db.commit()
+    
+    plan = await SettlementService(db).calculate_optimal_settlements(expense.group_id)
+    
+    assert plan == []
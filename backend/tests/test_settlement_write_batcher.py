@@ -0,0 +1,112 @@
+"""
+Settlement inserts through the shared write batcher
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, Settlement, Transaction
+from app.services.settlement import (
+    SettlementService,
+    start_settlement_write_batcher,
+    stop_settlement_write_batcher
+)
+
+DEBTOR = "B" * 58
+CREDITOR = "C" * 58
+TX_ID = "T" * 52
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    start_settlement_write_batcher(factory)
+    
+    yield factory
+    
+    await stop_settlement_write_batcher()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_off_chain_settlement_is_returned(db):
+    settlement = await SettlementService(db).initiate_settlement(
+        debtor_address=DEBTOR,
+        debtor_private_key=None,
+        creditor_address=CREDITOR,
+        amount=500_000
+    )
+    
+    assert isinstance(settlement, Settlement)
+    assert settlement.id is not None
+    assert settlement.status == "pending"
+    assert settlement.transaction_id is None
+
+
+@pytest.mark.asyncio
+async def test_on_chain_settlement_records_transaction(db):
+    service = SettlementService(db)
+    
+    async def initiate_on_chain(**kwargs):
+        return SimpleNamespace(decode_log=lambda index: 7, tx_id=TX_ID, confirmed_round=42)
+    
+    service.algo_service = SimpleNamespace(initiate_settlement=initiate_on_chain)
+    
+    settlement = await service.initiate_settlement(
+        debtor_address=DEBTOR,
+        debtor_private_key="key",
+        creditor_address=CREDITOR,
+        amount=500_000
+    )
+    
+    assert settlement.chain_settlement_id == 7
+    assert settlement.transaction_id == TX_ID
+    
+    transaction = (await db.execute(select(Transaction))).scalar_one()
+    assert transaction.transaction_id == TX_ID
+    assert transaction.tx_metadata["settlement_id"] == 7
+
+
+@pytest.mark.asyncio
+async def test_concurrent_settlements_share_the_batch(session_factory, db):
+    async def initiate(amount):
+        async with session_factory() as session:
+            service = SettlementService(session)
+            
+            async def initiate_on_chain(**kwargs):
+                return SimpleNamespace(
+                    decode_log=lambda index: amount,
+                    tx_id=f"{amount:052d}",
+                    confirmed_round=42
+                )
+            
+            service.algo_service = SimpleNamespace(initiate_settlement=initiate_on_chain)
+            return await service.initiate_settlement(
+                debtor_address=DEBTOR,
+                debtor_private_key="key",
+                creditor_address=CREDITOR,
+                amount=amount
+            )
+    
+    settlements = await asyncio.gather(*(initiate(amount) for amount in range(1, 6)))
+    
+    assert len({settlement.id for settlement in settlements}) == 5
+    
+    listed = await SettlementService(db).get_user_settlements(DEBTOR)
+    assert sorted(settlement.amount for settlement in listed) == [1, 2, 3, 4, 5]